@@ -1,38 +1,23 @@
-"""Configuration: environment variables, brand constants, defaults."""
+"""Configuration: environment variables, brand constants, defaults.
+
+Static constants are plain module attributes. Everything derived from the
+environment or the filesystem lives on a cached ``Settings`` object built by
+``get_settings()`` on first call, so importing this (or any module that
+imports it) does no I/O. Read settings inside functions, never at import.
+"""
 
 from __future__ import annotations
 
+import functools
 import os
+from dataclasses import dataclass
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-# ── Load .env ──────────────────────────────────────────────────────
-load_dotenv(Path(__file__).resolve().parent.parent / ".env")
-
-# ── API keys ───────────────────────────────────────────────────────
-GEMINI_API_KEY: str = os.environ["GEMINI_API_KEY"]
-ANTHROPIC_API_KEY: str = os.environ.get("ANTHROPIC_API_KEY", "")
-TELEGRAM_BOT_TOKEN: str = os.environ.get("TELEGRAM_BOT_TOKEN", "")
-
-# ── Access control ─────────────────────────────────────────────────
-ALLOWED_USER_IDS: set[int] = {
-    int(uid.strip())
-    for uid in os.environ.get("ALLOWED_USER_IDS", "").split(",")
-    if uid.strip()
-}
-
-# ── Server ─────────────────────────────────────────────────────────
-PORT: int = int(os.environ.get("PORT", "8000"))
-
 # ── Paths ──────────────────────────────────────────────────────────
 PROJECT_ROOT: Path = Path(__file__).resolve().parent.parent
-DATA_DIR: Path = Path(os.environ.get("DATA_DIR", str(PROJECT_ROOT / "data")))
-OUTPUTS_DIR: Path = Path(os.environ.get("OUTPUTS_DIR", str(PROJECT_ROOT / "outputs")))
 REFERENCE_DIR: Path = PROJECT_ROOT / "reference-images"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
-REFERENCE_DIR.mkdir(exist_ok=True)
 
 # ── Gemini defaults ────────────────────────────────────────────────
 GEMINI_MODEL: str = "gemini-3-pro-image-preview"
@@ -66,14 +51,11 @@ BRAND = {
 # ── Default product image (always included as reference) ───────────
 # Place your product jar image in reference-images/product-jar.png (or .jpg)
 # It will be auto-included in every generation request.
-_product_candidates = [
-    REFERENCE_DIR / "product-jar.png",
-    REFERENCE_DIR / "product-jar.jpg",
-    REFERENCE_DIR / "product-jar.jpeg",
-    REFERENCE_DIR / "product-jar.webp",
-]
-DEFAULT_PRODUCT_IMAGE: Path | None = next(
-    (p for p in _product_candidates if p.exists()), None
+_PRODUCT_IMAGE_NAMES = (
+    "product-jar.png",
+    "product-jar.jpg",
+    "product-jar.jpeg",
+    "product-jar.webp",
 )
 
 # ── Pipeline ───────────────────────────────────────────────────────
@@ -86,3 +68,97 @@ VARIANT_LABELS: list[str] = [
     "v6-reference-copy",
 ]
 NUM_VARIANTS: int = 6
+
+
+# ── Environment-derived settings ───────────────────────────────────
+
+@dataclass(frozen=True)
+class Settings:
+    # API keys
+    gemini_api_key: str
+    anthropic_api_key: str
+    telegram_bot_token: str
+
+    # Access control
+    allowed_user_ids: frozenset[int]
+
+    # Server
+    port: int
+
+    # Paths
+    data_dir: Path
+    outputs_dir: Path
+    default_product_image: Path | None
+
+    # Gemini
+    gemini_concurrency: int
+    output_format: str  # "png" or "webp"
+    # Upload each job's reference images once as a Gemini CachedContent and
+    # reuse it across the variant calls (falls back to inline parts on error)
+    gemini_context_cache: bool
+    # Seconds a generated image is reused for an identical variant request
+    # (same narrative prompt, settings and references); 0 disables
+    image_reuse_ttl: int
+
+    # Claude
+    # "auto" lets requests use Priority Tier (lower latency) capacity when the
+    # org has it; "standard_only" pins them to the standard tier
+    claude_service_tier: str
+    # Seconds an exact-match architect response stays cached; 0 disables
+    architect_cache_ttl: int
+    # Seconds a completed job is reused for an identical request; 0 disables
+    pipeline_cache_ttl: int
+
+    # Pipeline
+    # Also emit the legacy one-event-per-variant VARIANT_SCORED fan-out
+    emit_per_variant_scores: bool
+
+
+def _ensure_dir(path: Path, parents: bool = True) -> None:
+    """mkdir only when missing — the common path is a single stat."""
+    if not os.path.isdir(path):
+        path.mkdir(parents=parents, exist_ok=True)
+
+
+def _find_product_image() -> Path | None:
+    """Locate the product jar with one directory listing instead of a stat per candidate."""
+    with os.scandir(REFERENCE_DIR) as it:
+        names = {entry.name for entry in it}
+    return next(
+        (REFERENCE_DIR / name for name in _PRODUCT_IMAGE_NAMES if name in names), None
+    )
+
+
+@functools.cache
+def get_settings() -> Settings:
+    """Load .env and parse the environment once per process."""
+    load_dotenv(PROJECT_ROOT / ".env")
+
+    data_dir = Path(os.environ.get("DATA_DIR", str(PROJECT_ROOT / "data")))
+    outputs_dir = Path(os.environ.get("OUTPUTS_DIR", str(PROJECT_ROOT / "outputs")))
+    _ensure_dir(data_dir)
+    _ensure_dir(outputs_dir)
+    _ensure_dir(REFERENCE_DIR, parents=False)
+
+    return Settings(
+        gemini_api_key=os.environ["GEMINI_API_KEY"],
+        anthropic_api_key=os.environ.get("ANTHROPIC_API_KEY", ""),
+        telegram_bot_token=os.environ.get("TELEGRAM_BOT_TOKEN", ""),
+        allowed_user_ids=frozenset(
+            int(uid.strip())
+            for uid in os.environ.get("ALLOWED_USER_IDS", "").split(",")
+            if uid.strip()
+        ),
+        port=int(os.environ.get("PORT", "8000")),
+        data_dir=data_dir,
+        outputs_dir=outputs_dir,
+        default_product_image=_find_product_image(),
+        gemini_concurrency=int(os.environ.get("GEMINI_CONCURRENCY", "6")),
+        output_format=os.environ.get("OUTPUT_FORMAT", "png").lower(),
+        gemini_context_cache=os.environ.get("GEMINI_CONTEXT_CACHE", "0") == "1",
+        image_reuse_ttl=int(os.environ.get("IMAGE_REUSE_TTL", "0")),
+        claude_service_tier=os.environ.get("CLAUDE_SERVICE_TIER", "auto"),
+        architect_cache_ttl=int(os.environ.get("ARCHITECT_CACHE_TTL", "86400")),
+        pipeline_cache_ttl=int(os.environ.get("PIPELINE_CACHE_TTL", "0")),
+        emit_per_variant_scores=os.environ.get("EMIT_PER_VARIANT_SCORES", "0") == "1",
+    )
@@ -9,7 +9,8 @@ import sys
 
 import uvicorn
 
-from bot.config import PORT, TELEGRAM_BOT_TOKEN
+from bot.config import get_settings
+from bot.pipeline.utils import close_anthropic_client
 from bot.telegram_bot.bot import build_application
 from bot.web.app import create_app
 from bot.web.websocket import setup_ws_events
@@ -24,6 +25,7 @@ logger = logging.getLogger("banana-squad")
 
 async def main() -> None:
     logger.info("Starting Banana Squad platform...")
+    settings = get_settings()
 
     # Set up WebSocket event forwarding
     await setup_ws_events()
@@ -35,36 +37,39 @@ async def main() -> None:
     uvicorn_config = uvicorn.Config(
         app=fastapi_app,
         host="0.0.0.0",
-        port=PORT,
+        port=settings.port,
         log_level="info",
         access_log=False,
     )
     uvicorn_server = uvicorn.Server(uvicorn_config)
 
-    if TELEGRAM_BOT_TOKEN:
-        # Build Telegram bot
-        telegram_app = build_application()
-
-        # Initialize the Telegram application
-        await telegram_app.initialize()
-        await telegram_app.start()
-
-        # Start polling (non-blocking)
-        await telegram_app.updater.start_polling(drop_pending_updates=True)
-        logger.info("Telegram bot started polling")
-
-        try:
-            # Run uvicorn (blocks until shutdown)
+    try:
+        if settings.telegram_bot_token:
+            # Build Telegram bot
+            telegram_app = build_application()
+
+            # Initialize the Telegram application
+            await telegram_app.initialize()
+            await telegram_app.start()
+
+            # Start polling (non-blocking)
+            await telegram_app.updater.start_polling(drop_pending_updates=True)
+            logger.info("Telegram bot started polling")
+
+            try:
+                # Run uvicorn (blocks until shutdown)
+                await uvicorn_server.serve()
+            finally:
+                # Graceful shutdown
+                logger.info("Shutting down...")
+                await telegram_app.updater.stop()
+                await telegram_app.stop()
+                await telegram_app.shutdown()
+        else:
+            logger.warning("No TELEGRAM_BOT_TOKEN — running web dashboard only")
             await uvicorn_server.serve()
-        finally:
-            # Graceful shutdown
-            logger.info("Shutting down...")
-            await telegram_app.updater.stop()
-            await telegram_app.stop()
-            await telegram_app.shutdown()
-    else:
-        logger.warning("No TELEGRAM_BOT_TOKEN — running web dashboard only")
-        await uvicorn_server.serve()
+    finally:
+        await close_anthropic_client()
 
 
 if __name__ == "__main__":
@@ -2,23 +2,22 @@
 
 from __future__ import annotations
 
-import base64
-import json
+import asyncio
 import logging
 from pathlib import Path
 
-import anthropic
+import orjson
 
-from bot.config import ANTHROPIC_API_KEY, CLAUDE_MODEL
+from bot.config import CLAUDE_MODEL, get_settings
 from bot.pipeline.events import Event, EventType, event_bus
 from bot.pipeline.models import (
+    VARIANT_BY_VALUE,
     CriticResult,
     CriticScore,
     GeneratedImage,
     VariantEvaluation,
-    VariantType,
 )
-from bot.pipeline.utils import detect_media_type
+from bot.pipeline.utils import get_anthropic_client, read_image_b64
 
 logger = logging.getLogger(__name__)
 
@@ -81,19 +80,39 @@ async def run_critic(
         logger.warning("No successful images to evaluate")
         return CriticResult(summary="No images were generated successfully.")
 
-    client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    if len(successful) == 1:
+        # Nothing to rank — skip the Claude call entirely
+        only = successful[0]
+        logger.info("Only one successful image — skipping critic call")
+        return CriticResult(
+            evaluations=[VariantEvaluation(
+                variant_type=only.variant_type,
+                scores=CriticScore(
+                    faithfulness=8.0, conciseness=8.0, readability=8.0, aesthetics=8.0,
+                ),
+                review="Only successful variant.",
+                rank=1,
+            )],
+            summary="Only one variant generated successfully.",
+            winner=only.variant_type,
+        )
+
+    client = get_anthropic_client()
 
     content: list[dict] = []
     labels = []
 
-    for img in successful:
-        path = Path(img.file_path)
-        if not path.exists():
+    blobs = await asyncio.gather(*[
+        asyncio.to_thread(read_image_b64, Path(img.file_path)) for img in successful
+    ])
+
+    for img, blob in zip(successful, blobs):
+        if blob is None:
             continue
 
         labels.append(img.variant_type.value)
 
-        raw_bytes = path.read_bytes()
+        media_type, b64 = blob
         content.append({
             "type": "text",
             "text": f"--- {img.variant_type.value} ---",
@@ -102,8 +121,8 @@ async def run_critic(
             "type": "image",
             "source": {
                 "type": "base64",
-                "media_type": detect_media_type(raw_bytes, path.suffix),
-                "data": base64.standard_b64encode(raw_bytes).decode(),
+                "media_type": media_type,
+                "data": b64,
             },
         })
 
@@ -116,7 +135,7 @@ async def run_critic(
         ),
     })
 
-    await event_bus.emit(Event(
+    await event_bus.emit_async(Event(
         type=EventType.AGENT_MESSAGE,
         job_id=job_id,
         data={"agent": "critic", "message": f"Evaluating {len(labels)} variants..."},
@@ -124,6 +143,7 @@ async def run_critic(
 
     response = await client.messages.create(
         model=CLAUDE_MODEL,
+        service_tier=get_settings().claude_service_tier,
         max_tokens=2500,
         system=CRITIC_SYSTEM,
         messages=[{"role": "user", "content": content}],
@@ -134,24 +154,35 @@ async def run_critic(
 
     result = _parse_critic(raw)
 
-    # Emit individual scores
-    for ev in result.evaluations:
-        await event_bus.emit(Event(
-            type=EventType.VARIANT_SCORED,
-            job_id=job_id,
-            data={
-                "variant": ev.variant_type.value,
-                "scores": {
-                    "faithfulness": ev.scores.faithfulness,
-                    "conciseness": ev.scores.conciseness,
-                    "readability": ev.scores.readability,
-                    "aesthetics": ev.scores.aesthetics,
-                    "total": ev.scores.total,
-                },
-                "rank": ev.rank,
-                "review": ev.review,
+    # Emit all scores in one event
+    scored = [
+        {
+            "variant": ev.variant_type.value,
+            "scores": {
+                "faithfulness": ev.scores.faithfulness,
+                "conciseness": ev.scores.conciseness,
+                "readability": ev.scores.readability,
+                "aesthetics": ev.scores.aesthetics,
+                "total": ev.scores.total,
             },
-        ))
+            "rank": ev.rank,
+            "review": ev.review,
+        }
+        for ev in result.evaluations
+    ]
+    await event_bus.emit_async(Event(
+        type=EventType.VARIANTS_SCORED_BATCH,
+        job_id=job_id,
+        data={"variants": scored},
+    ))
+
+    if get_settings().emit_per_variant_scores:
+        for data in scored:
+            await event_bus.emit_async(Event(
+                type=EventType.VARIANT_SCORED,
+                job_id=job_id,
+                data=data,
+            ))
 
     return result
 
@@ -160,39 +191,38 @@ def _parse_critic(raw: str) -> CriticResult:
     """Parse JSON from critic response."""
     text = raw.strip()
     if text.startswith("```"):
-        lines = text.split("\n")
-        lines = lines[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        text = "\n".join(lines)
+        nl = text.find("\n")
+        text = text[nl + 1:] if nl != -1 else ""
+        text = text.removesuffix("```").rstrip()
 
     try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
         logger.error("Failed to parse critic JSON: %s", text[:200])
         return CriticResult(summary="Failed to parse evaluation results.")
 
     evaluations = []
     for item in data.get("evaluations", []):
         scores_data = item.get("scores", {})
-        try:
-            vtype = VariantType(item.get("variant_type", ""))
-        except ValueError:
+        vtype = VARIANT_BY_VALUE.get(item.get("variant_type", ""))
+        if vtype is None:
             continue
 
         evaluations.append(VariantEvaluation(
             variant_type=vtype,
             scores=CriticScore(
-                faithfulness=float(scores_data.get("faithfulness", 5)),
-                conciseness=float(scores_data.get("conciseness", 5)),
-                readability=float(scores_data.get("readability", 5)),
-                aesthetics=float(scores_data.get("aesthetics", 5)),
+                faithfulness=scores_data.get("faithfulness", 5),
+                conciseness=scores_data.get("conciseness", 5),
+                readability=scores_data.get("readability", 5),
+                aesthetics=scores_data.get("aesthetics", 5),
             ),
             review=item.get("review", ""),
         ))
 
-    # Sort by total score descending and assign ranks
-    evaluations.sort(key=lambda e: e.scores.total, reverse=True)
+    # Sort by total score descending and assign ranks (totals computed once)
+    totals = [ev.scores.total for ev in evaluations]
+    order = sorted(range(len(evaluations)), key=totals.__getitem__, reverse=True)
+    evaluations = [evaluations[i] for i in order]
     for rank, ev in enumerate(evaluations, 1):
         ev.rank = rank
 
@@ -200,12 +230,7 @@ def _parse_critic(raw: str) -> CriticResult:
     if evaluations:
         winner = evaluations[0].variant_type
 
-    winner_str = data.get("winner", "")
-    if winner_str:
-        try:
-            winner = VariantType(winner_str)
-        except ValueError:
-            pass
+    winner = VARIANT_BY_VALUE.get(data.get("winner", ""), winner)
 
     return CriticResult(
         evaluations=evaluations,
@@ -3,8 +3,14 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import hashlib
+import io
 import logging
+from collections.abc import AsyncIterable, Awaitable, Callable, Iterable, Sized
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 
 from google import genai
 from google.genai import types
@@ -13,63 +19,207 @@ from PIL import Image
 from bot.config import (
     DEFAULT_ASPECT_RATIO,
     DEFAULT_RESOLUTION,
-    GEMINI_API_KEY,
     GEMINI_MODEL,
     MAX_RETRIES,
-    OUTPUTS_DIR,
+    NUM_VARIANTS,
+    get_settings,
 )
 from bot.pipeline.events import Event, EventType, event_bus
-from bot.pipeline.models import GeneratedImage, PromptVariant, Refinement
+from bot.pipeline.models import GeneratedImage, PromptVariant, Refinement, variant_order
+from bot.pipeline.utils import detect_media_type, link_or_copy
+from bot.storage.cache import get_response_cache
 
 logger = logging.getLogger(__name__)
 
+# Product jar Part, keyed by (path, mtime_ns) — it is attached to every job
+_product_part_cache: dict[tuple[str, int], types.Part] = {}
 
-def _make_client() -> genai.Client:
-    return genai.Client(api_key=GEMINI_API_KEY)
+# Next refinement version per (job_id, variant); seeded from disk once per process
+_refine_counters: dict[tuple[str, str], int] = {}
+_counter_lock = asyncio.Lock()
+
+# Job directories already created by this process
+_ensured_job_dirs: set[str] = set()
+
+
+def _output_suffix() -> str:
+    return ".webp" if get_settings().output_format == "webp" else ".png"
+
+
+@functools.cache
+def _save_pool() -> ThreadPoolExecutor:
+    """Image writes, so a save overlaps with the rest of its Gemini stream."""
+    return ThreadPoolExecutor(
+        max_workers=get_settings().gemini_concurrency, thread_name_prefix="image-save",
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client() -> genai.Client:
+    """Process-wide Gemini client, so its connection pool is reused across calls."""
+    return genai.Client(api_key=get_settings().gemini_api_key)
+
+
+def _ensure_job_dir(job_id: str) -> Path:
+    """Output directory for a job, created at most once per process."""
+    job_dir = get_settings().outputs_dir / job_id
+    if job_id not in _ensured_job_dirs:
+        job_dir.mkdir(parents=True, exist_ok=True)
+        _ensured_job_dirs.add(job_id)
+    return job_dir
+
+
+# ── Prompt fragments (built once at import) ───────────────────────
+
+# v6: the ad reference is the priority — copy it near-identically
+_REF_INSTRUCTION_COPY_MULTI = (
+    "IMPORTANT CONTEXT FOR ATTACHED IMAGES:\n"
+    "- The FIRST attached image is the ApotekHunden product jar (for reference only — "
+    "include it ONLY if the reference ad also shows a product jar).\n"
+    "- The SECOND attached image (and any after it) is the REFERENCE AD that you MUST "
+    "replicate as closely as possible. Copy its EXACT layout, composition, element "
+    "placement, angles, spacing, and visual hierarchy. Reproduce it nearly identically "
+    "but replace all branding with ApotekHunden (forest green #2C5530, cream #FAF7F2, "
+    "amber #C8924A) and translate all text to Swedish.\n"
+    "ALL text in the image MUST be in Swedish — no English.\n\n"
+)
+_REF_INSTRUCTION_COPY_SINGLE = (
+    "IMPORTANT: The attached image is the ApotekHunden product jar for reference. "
+    "Only include the jar if your prompt calls for it. "
+    "ALL text in the image MUST be in Swedish — no English.\n\n"
+)
+
+# v1-v5: product jar is purely optional reference material
+_REF_INSTRUCTION_MULTI = (
+    "CONTEXT FOR ATTACHED IMAGES:\n"
+    "- The FIRST attached image shows the ApotekHunden product jar. This is reference "
+    "material ONLY — do NOT place the jar in the image unless the prompt below "
+    "explicitly describes a product jar in the scene.\n"
+    "- The remaining attached image(s) are style/mood references for inspiration. "
+    "Draw on their visual style but create an original composition as described in the prompt.\n"
+    "ALL text in the image MUST be in Swedish — no English.\n\n"
+)
+_REF_INSTRUCTION_SINGLE = (
+    "The attached image shows the ApotekHunden product jar for reference ONLY. "
+    "Do NOT place the jar in the image unless the prompt below explicitly describes "
+    "a product jar in the scene. "
+    "ALL text in the image MUST be in Swedish — no English.\n\n"
+)
+
+_REFINE_HEADER = (
+    "You are refining an existing ad image. The attached image is the CURRENT "
+    "version. Keep everything that works well, but apply these changes:\n\n"
+)
+_REFINE_USER_TMPL = "User's refinement instructions: {instruction}\n\n"
+_REFINE_DEFAULT = (
+    "The user wants a refined version with improved quality, sharper details, "
+    "better typography, and more professional finish.\n\n"
+)
+_REFINE_FOOTER_TMPL = (
+    "Original prompt for context: {prompt}\n\n"
+    "ALL text in the image MUST be in Swedish — no English. "
+    "IF a product jar appears, keep the exact ApotekHunden jar design."
+)
+_REFINE_CONTEXT_WITH_REFS = (
+    "The first attached image(s) are reference photos (product jar etc). "
+    "The last attached image is the CURRENT ad to refine. "
+    "ALL text MUST be in Swedish.\n\n"
+)
+_REFINE_CONTEXT = (
+    "The attached image is the CURRENT ad to refine. "
+    "ALL text MUST be in Swedish.\n\n"
+)
 
 
 def _build_reference_instruction(variant_type: str, num_ref_images: int) -> str:
-    """Build variant-aware instructions for how Gemini should use attached reference images."""
+    """Pick the variant-aware instructions for how Gemini should use attached reference images."""
 
     if variant_type == "v6-reference-copy":
-        # v6: the ad reference is the priority — copy it near-identically
-        if num_ref_images > 1:
-            return (
-                "IMPORTANT CONTEXT FOR ATTACHED IMAGES:\n"
-                "- The FIRST attached image is the ApotekHunden product jar (for reference only — "
-                "include it ONLY if the reference ad also shows a product jar).\n"
-                "- The SECOND attached image (and any after it) is the REFERENCE AD that you MUST "
-                "replicate as closely as possible. Copy its EXACT layout, composition, element "
-                "placement, angles, spacing, and visual hierarchy. Reproduce it nearly identically "
-                "but replace all branding with ApotekHunden (forest green #2C5530, cream #FAF7F2, "
-                "amber #C8924A) and translate all text to Swedish.\n"
-                "ALL text in the image MUST be in Swedish — no English.\n\n"
-            )
-        else:
-            return (
-                "IMPORTANT: The attached image is the ApotekHunden product jar for reference. "
-                "Only include the jar if your prompt calls for it. "
-                "ALL text in the image MUST be in Swedish — no English.\n\n"
-            )
+        return _REF_INSTRUCTION_COPY_MULTI if num_ref_images > 1 else _REF_INSTRUCTION_COPY_SINGLE
+    return _REF_INSTRUCTION_MULTI if num_ref_images > 1 else _REF_INSTRUCTION_SINGLE
+
+
+def _load_part(path: str) -> types.Part:
+    """Read an image file into an inline-data Part, sent as-is to Gemini.
+
+    Building the Part from the on-disk bytes means the SDK never re-encodes a
+    PIL image per call.
+    """
+    p = Path(path)
+    cache_key = None
+    product_image = get_settings().default_product_image
+    if product_image and p == product_image:
+        cache_key = (path, p.stat().st_mtime_ns)
+        cached = _product_part_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    raw_bytes = p.read_bytes()
+    part = types.Part.from_bytes(
+        data=raw_bytes,
+        mime_type=detect_media_type(raw_bytes, p.suffix),
+    )
+
+    if cache_key is not None:
+        _product_part_cache.clear()
+        _product_part_cache[cache_key] = part
+    return part
+
+
+async def _load_reference_parts(paths: list[str] | None) -> list[types.Part]:
+    """Read all existing reference images in parallel threads."""
+    if not paths:
+        return []
+    return list(await asyncio.gather(*[
+        asyncio.to_thread(_load_part, p) for p in paths if Path(p).exists()
+    ]))
+
+
+def _save_image(image: types.Image, path: Path) -> None:
+    """Write a generated image to disk (runs in the Gemini worker thread).
+
+    PNG output writes Gemini's already-encoded bytes untouched — no decode or
+    re-encode. WEBP output re-encodes once at q92, giving much smaller files
+    for the critic to read and upload.
+    """
+    if get_settings().output_format == "webp":
+        pil = Image.open(io.BytesIO(image.image_bytes))
+        pil.save(str(path), format="WEBP", quality=92, method=4)
     else:
-        # v1-v5: product jar is purely optional reference material
-        if num_ref_images > 1:
-            return (
-                "CONTEXT FOR ATTACHED IMAGES:\n"
-                "- The FIRST attached image shows the ApotekHunden product jar. This is reference "
-                "material ONLY — do NOT place the jar in the image unless the prompt below "
-                "explicitly describes a product jar in the scene.\n"
-                "- The remaining attached image(s) are style/mood references for inspiration. "
-                "Draw on their visual style but create an original composition as described in the prompt.\n"
-                "ALL text in the image MUST be in Swedish — no English.\n\n"
-            )
-        else:
-            return (
-                "The attached image shows the ApotekHunden product jar for reference ONLY. "
-                "Do NOT place the jar in the image unless the prompt below explicitly describes "
-                "a product jar in the scene. "
-                "ALL text in the image MUST be in Swedish — no English.\n\n"
-            )
+        image.save(str(path))
+
+
+def _collect_stream(
+    stream: Iterable[types.GenerateContentResponse],
+    on_image: Callable[[types.Image], None] | None = None,
+) -> tuple[types.Image | None, str]:
+    """Consume a streamed Gemini response into (image, text).
+
+    The last image part wins. ``on_image`` runs on the save pool for each
+    image part as it arrives, so the disk write overlaps with the tail of the
+    stream; saves are serialized and the last one is awaited before returning.
+    """
+
+    result_image = None
+    text_parts: list[str] = []
+    pending: Future | None = None
+
+    for chunk in stream:
+        for part in chunk.parts or ():
+            if getattr(part, "thought", False):
+                continue
+            if part.text is not None:
+                text_parts.append(part.text)
+            elif part.inline_data is not None:
+                result_image = part.as_image()
+                if on_image is not None:
+                    if pending is not None:
+                        pending.result()
+                    pending = _save_pool().submit(on_image, result_image)
+
+    if pending is not None:
+        pending.result()
+    return result_image, "".join(text_parts)
 
 
 def _generate_single(
@@ -77,24 +227,31 @@ def _generate_single(
     prompt: str,
     aspect_ratio: str,
     resolution: str,
-    reference_images: list[Image.Image] | None = None,
+    reference_parts: list[types.Part] | None = None,
     variant_type: str = "",
-) -> tuple[Image.Image | None, str]:
-    """Synchronous Gemini call — will be wrapped in asyncio.to_thread."""
+    on_image: Callable[[types.Image], None] | None = None,
+    cached_content: str | None = None,
+) -> tuple[types.Image | None, str]:
+    """Synchronous streaming Gemini call — will be wrapped in asyncio.to_thread.
+
+    With ``cached_content`` the reference images already live in that cache,
+    so only the instruction and prompt are sent.
+    """
 
     contents: list = []
-    if reference_images:
-        for ref_img in reference_images:
-            contents.append(ref_img)
+    if reference_parts:
+        if cached_content is None:
+            contents.extend(reference_parts)
         contents.append(
-            _build_reference_instruction(variant_type, len(reference_images))
+            _build_reference_instruction(variant_type, len(reference_parts))
         )
     contents.append(prompt)
 
-    response = client.models.generate_content(
+    stream = client.models.generate_content_stream(
         model=GEMINI_MODEL,
         contents=contents,
         config=types.GenerateContentConfig(
+            cached_content=cached_content,
             response_modalities=["TEXT", "IMAGE"],
             image_config=types.ImageConfig(
                 aspect_ratio=aspect_ratio,
@@ -103,93 +260,153 @@ def _generate_single(
         ),
     )
 
-    result_image = None
-    result_text = ""
+    return _collect_stream(stream, on_image)
 
-    if response.parts:
-        for part in response.parts:
-            if hasattr(part, "thought") and part.thought:
-                continue
-            if part.text is not None:
-                result_text += part.text
-            elif part.inline_data is not None:
-                result_image = part.as_image()
 
-    return result_image, result_text
+def _create_ref_cache(client: genai.Client, ref_parts: list[types.Part]) -> str | None:
+    """Upload reference parts as a CachedContent; None if caching is unavailable."""
+    try:
+        cache = client.caches.create(
+            model=GEMINI_MODEL,
+            config=types.CreateCachedContentConfig(
+                contents=[types.Content(role="user", parts=ref_parts)],
+                ttl="600s",
+            ),
+        )
+    except Exception as e:
+        logger.warning("Gemini context cache unavailable, sending references inline: %s", e)
+        return None
+    return cache.name
+
+
+def _delete_ref_cache(client: genai.Client, name: str) -> None:
+    try:
+        client.caches.delete(name=name)
+    except Exception as e:
+        logger.warning("Failed to delete Gemini context cache %s: %s", name, e)
+
+
+class PreparedReferences(NamedTuple):
+    """A job's reference images, read and (optionally) uploaded to a context cache."""
+    parts: list[types.Part]
+    cache_name: str | None
+
+
+async def prepare_references(paths: list[str] | None) -> PreparedReferences:
+    """Read reference images and, with ``gemini_context_cache`` set, upload them once.
+
+    Needs nothing from research or the architect, so the pipeline starts it
+    up front and the upload overlaps the Claude stages.
+    """
+    parts = await _load_reference_parts(paths)
+    cache_name = None
+    if get_settings().gemini_context_cache and parts:
+        cache_name = await asyncio.to_thread(_create_ref_cache, _get_client(), parts)
+    return PreparedReferences(parts, cache_name)
+
+
+async def release_references(task: asyncio.Task[PreparedReferences]) -> None:
+    """Cancel an unfinished preparation, or delete the context cache it created.
+
+    A cache whose upload was already running when cancelled is left to expire
+    on its TTL.
+    """
+    if not task.done():
+        task.cancel()
+        return
+    if task.cancelled() or task.exception() is not None:
+        return
+    cache_name = task.result().cache_name
+    if cache_name:
+        await asyncio.to_thread(_delete_ref_cache, _get_client(), cache_name)
+
+
+def _parts_digest(parts: list[types.Part]) -> str:
+    """Content hash of the reference parts, for image-reuse keys."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.inline_data.data)
+    return h.hexdigest()
 
 
 async def run_generator(
     job_id: str,
-    prompts: list[PromptVariant],
+    prompts: Iterable[PromptVariant] | AsyncIterable[PromptVariant],
     aspect_ratio: str = DEFAULT_ASPECT_RATIO,
     resolution: str = DEFAULT_RESOLUTION,
     reference_image_paths: list[str] | None = None,
+    references: Awaitable[PreparedReferences] | None = None,
+    on_result: Callable[[GeneratedImage], None] | None = None,
 ) -> list[GeneratedImage]:
-    """Generate images sequentially with progress events."""
-
-    job_dir = OUTPUTS_DIR / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
-
-    client = _make_client()
-
-    # Load reference images once
-    ref_images: list[Image.Image] | None = None
-    if reference_image_paths:
-        ref_images = []
-        for p in reference_image_paths:
-            path = Path(p)
-            if path.exists():
-                ref_images.append(Image.open(path))
-
-    results: list[GeneratedImage] = []
-
-    for i, variant in enumerate(prompts):
-        await event_bus.emit(Event(
-            type=EventType.PROGRESS,
-            job_id=job_id,
-            data={
-                "agent": "generator",
-                "message": f"Generating image {i + 1}/{len(prompts)}: {variant.label}",
-                "current": i + 1,
-                "total": len(prompts),
-            },
-        ))
-
-        success = False
-        last_error = ""
-
-        for attempt in range(MAX_RETRIES + 1):
-            try:
-                image, text = await asyncio.to_thread(
-                    _generate_single,
-                    client,
-                    variant.narrative_prompt,
-                    aspect_ratio,
-                    resolution,
-                    ref_images,
-                    variant.variant_type.value,
-                )
-
-                if image is None:
-                    last_error = "No image in Gemini response (safety filter?)"
-                    logger.warning(
-                        "Attempt %d/%d for %s: %s",
-                        attempt + 1, MAX_RETRIES + 1, variant.variant_type.value, last_error,
-                    )
-                    continue
+    """Generate all variants concurrently (bounded by ``gemini_concurrency``).
+
+    ``prompts`` may be an async iterable (the streaming prompt architect), in
+    which case each variant starts generating as soon as it arrives.
+    ``references`` is an already-started ``prepare_references``; its caller
+    owns (and releases) any context cache in it. Otherwise the references
+    are prepared and released here. ``on_result`` is called with each
+    successful image as soon as its file is on disk.
+    """
+
+    job_dir = _ensure_job_dir(job_id)
+
+    client = _get_client()
+
+    # Read (and upload) reference images once, shared by all variants — in the
+    # background, so a streaming prompt source isn't held up by them
+    owned_refs: asyncio.Task[PreparedReferences] | None = None
+    if references is None:
+        owned_refs = asyncio.create_task(prepare_references(reference_image_paths))
+        references = owned_refs
+    ref_task = asyncio.ensure_future(references)
+
+    settings = get_settings()
+    suffix = _output_suffix()
+    sem = asyncio.Semaphore(settings.gemini_concurrency)
+    total = len(prompts) if isinstance(prompts, Sized) else NUM_VARIANTS
+    results: list[GeneratedImage | None] = []
+    n_success = 0
+
+    refs_digest: asyncio.Task[str] | None = None
+
+    async def _refs_digest(ref_parts: list[types.Part]) -> str:
+        """Hash the shared reference parts once per job, not once per variant."""
+        nonlocal refs_digest
+        if refs_digest is None:
+            refs_digest = asyncio.create_task(asyncio.to_thread(_parts_digest, ref_parts))
+        return await asyncio.shield(refs_digest)
+
+    async def _run_one(i: int, variant: PromptVariant) -> None:
+        async with sem:
+            # Fire-and-forget so a slow subscriber never delays the next Gemini call
+            event_bus.post(Event(
+                type=EventType.PROGRESS,
+                job_id=job_id,
+                data={
+                    "agent": "generator",
+                    "message": f"Generating image {i + 1}/{total}: {variant.label}",
+                    "current": i + 1,
+                    "total": total,
+                },
+            ))
 
-                file_name = f"{variant.variant_type.value}.png"
-                file_path = job_dir / file_name
-                image.save(str(file_path))
+            file_path = job_dir / f"{variant.variant_type.value}{suffix}"
+            save = functools.partial(_save_image, path=file_path)
+            ref_parts, cached_content = await asyncio.shield(ref_task)
 
-                results.append(GeneratedImage(
+            def _succeed(text: str) -> None:
+                nonlocal n_success
+                results[i] = image = GeneratedImage(
                     variant_type=variant.variant_type,
                     file_path=str(file_path),
                     gemini_text=text,
                     success=True,
-                ))
+                )
+                n_success += 1
+                if on_result is not None:
+                    on_result(image)
 
-                await event_bus.emit(Event(
+                event_bus.post(Event(
                     type=EventType.IMAGE_GENERATED,
                     job_id=job_id,
                     data={
@@ -199,30 +416,97 @@ async def run_generator(
                     },
                 ))
 
-                success = True
-                break
-
-            except Exception as e:
-                last_error = str(e)
-                logger.warning(
-                    "Attempt %d/%d for %s failed: %s",
-                    attempt + 1, MAX_RETRIES + 1, variant.variant_type.value, last_error,
+            # An identical variant request (same prompt, settings and
+            # references) reuses the earlier image instead of regenerating
+            reuse_key = None
+            if settings.image_reuse_ttl > 0:
+                reuse_key = get_response_cache().make_key(
+                    "image",
+                    vt=variant.variant_type.value,
+                    p=variant.narrative_prompt,
+                    ar=aspect_ratio,
+                    res=resolution,
+                    fmt=settings.output_format,
+                    refs=await _refs_digest(ref_parts),
                 )
-                if attempt < MAX_RETRIES:
-                    await asyncio.sleep(2 * (attempt + 1))
+                prior = await asyncio.to_thread(get_response_cache().get, reuse_key)
+                if prior and await asyncio.to_thread(link_or_copy, Path(prior), file_path):
+                    logger.info("Reusing %s for %s", prior, variant.variant_type.value)
+                    _succeed("")
+                    return
+
+            last_error = ""
+
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    image, text = await asyncio.to_thread(
+                        _generate_single,
+                        client,
+                        variant.narrative_prompt,
+                        aspect_ratio,
+                        resolution,
+                        ref_parts,
+                        variant.variant_type.value,
+                        save,
+                        cached_content,
+                    )
 
-        if not success:
-            results.append(GeneratedImage(
+                    if image is None:
+                        last_error = "No image in Gemini response (safety filter?)"
+                        logger.warning(
+                            "Attempt %d/%d for %s: %s",
+                            attempt + 1, MAX_RETRIES + 1, variant.variant_type.value, last_error,
+                        )
+                        continue
+
+                    _succeed(text)
+                    if reuse_key is not None:
+                        get_response_cache().set(reuse_key, str(file_path), settings.image_reuse_ttl)
+                    return
+
+                except Exception as e:
+                    last_error = str(e)
+                    logger.warning(
+                        "Attempt %d/%d for %s failed: %s",
+                        attempt + 1, MAX_RETRIES + 1, variant.variant_type.value, last_error,
+                    )
+                    # Don't let a bad cache sink the variant — retry inline
+                    cached_content = None
+                    if attempt < MAX_RETRIES:
+                        await asyncio.sleep(2 * (attempt + 1))
+
+            results[i] = GeneratedImage(
                 variant_type=variant.variant_type,
                 file_path="",
                 success=False,
                 error=last_error,
-            ))
+            )
 
-    logger.info(
-        "Generator completed: %d/%d successful",
-        sum(1 for r in results if r.success), len(results),
-    )
+    tasks: list[asyncio.Task] = []
+
+    def _start(variant: PromptVariant) -> None:
+        results.append(None)
+        tasks.append(asyncio.create_task(_run_one(len(tasks), variant)))
+
+    try:
+        if isinstance(prompts, AsyncIterable):
+            async for variant in prompts:
+                _start(variant)
+        else:
+            for variant in prompts:
+                _start(variant)
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        if owned_refs is not None:
+            await release_references(owned_refs)
+
+    logger.info("Generator completed: %d/%d successful", n_success, len(results))
+    # Slots follow arrival order of the (streamed) prompts; store them v1..v6
+    results.sort(key=variant_order)
     return results
 
 
@@ -238,62 +522,42 @@ async def run_refine(
 ) -> Refinement:
     """Refine a single variant image. Keeps the original, saves refined copy."""
 
-    job_dir = OUTPUTS_DIR / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
+    job_dir = _ensure_job_dir(job_id)
 
-    client = _make_client()
+    client = _get_client()
 
     # Build refinement prompt
-    refine_prompt = (
-        "You are refining an existing ad image. The attached image is the CURRENT "
-        "version. Keep everything that works well, but apply these changes:\n\n"
-    )
-    if instruction.strip():
-        refine_prompt += f"User's refinement instructions: {instruction}\n\n"
-    else:
-        refine_prompt += (
-            "The user wants a refined version with improved quality, sharper details, "
-            "better typography, and more professional finish.\n\n"
-        )
-    refine_prompt += (
-        f"Original prompt for context: {original_prompt}\n\n"
-        "ALL text in the image MUST be in Swedish — no English. "
-        "IF a product jar appears, keep the exact ApotekHunden jar design."
+    refine_prompt = "".join([
+        _REFINE_HEADER,
+        _REFINE_USER_TMPL.format(instruction=instruction) if instruction.strip() else _REFINE_DEFAULT,
+        _REFINE_FOOTER_TMPL.format(prompt=original_prompt),
+    ])
+
+    # Load the original image and any references (product jar etc.) together
+    original_part, *ref_parts = await asyncio.gather(
+        asyncio.to_thread(_load_part, original_image_path),
+        *[
+            asyncio.to_thread(_load_part, p)
+            for p in (reference_image_paths or []) if Path(p).exists()
+        ],
     )
 
-    # Load original image
-    original_img = await asyncio.to_thread(Image.open, original_image_path)
-
-    # Load product jar reference if available
-    ref_images: list[Image.Image] = []
-    if reference_image_paths:
-        for p in reference_image_paths:
-            path = Path(p)
-            if path.exists():
-                ref_images.append(Image.open(path))
-
     # Build contents: reference images + original image + prompt
     contents: list = []
-    for ref_img in ref_images:
-        contents.append(ref_img)
-    contents.append(original_img)
-    if ref_images:
-        contents.append(
-            "The first attached image(s) are reference photos (product jar etc). "
-            "The last attached image is the CURRENT ad to refine. "
-            "ALL text MUST be in Swedish.\n\n"
-        )
-    else:
-        contents.append(
-            "The attached image is the CURRENT ad to refine. "
-            "ALL text MUST be in Swedish.\n\n"
-        )
+    contents.extend(ref_parts)
+    contents.append(original_part)
+    contents.append(_REFINE_CONTEXT_WITH_REFS if ref_parts else _REFINE_CONTEXT)
     contents.append(refine_prompt)
 
-    # Count existing refinements to generate unique filename
-    existing = list(job_dir.glob(f"{variant}-refined-*.png"))
-    version = len(existing) + 1
-    refined_filename = f"{variant}-refined-{version}.png"
+    # Pick a unique version number without rescanning the job directory
+    suffix = _output_suffix()
+    async with _counter_lock:
+        key = (job_id, variant)
+        if key not in _refine_counters:
+            _refine_counters[key] = sum(1 for _ in job_dir.glob(f"{variant}-refined-*{suffix}"))
+        version = _refine_counters[key] + 1
+        _refine_counters[key] = version
+    refined_filename = f"{variant}-refined-{version}{suffix}"
     refined_path = job_dir / refined_filename
 
     last_error = ""
@@ -305,6 +569,7 @@ async def run_refine(
                 contents,
                 aspect_ratio,
                 resolution,
+                functools.partial(_save_image, path=refined_path),
             )
 
             if image is None:
@@ -312,8 +577,6 @@ async def run_refine(
                 logger.warning("Refine attempt %d: %s", attempt + 1, last_error)
                 continue
 
-            image.save(str(refined_path))
-
             logger.info("Refined %s → %s", variant, refined_filename)
             return Refinement(
                 variant=variant,
@@ -336,10 +599,11 @@ def _generate_single_raw(
     contents: list,
     aspect_ratio: str,
     resolution: str,
-) -> tuple[Image.Image | None, str]:
-    """Synchronous Gemini call with pre-built contents list."""
+    on_image: Callable[[types.Image], None] | None = None,
+) -> tuple[types.Image | None, str]:
+    """Synchronous streaming Gemini call with pre-built contents list."""
 
-    response = client.models.generate_content(
+    stream = client.models.generate_content_stream(
         model=GEMINI_MODEL,
         contents=contents,
         config=types.GenerateContentConfig(
@@ -351,16 +615,4 @@ def _generate_single_raw(
         ),
     )
 
-    result_image = None
-    result_text = ""
-
-    if response.parts:
-        for part in response.parts:
-            if hasattr(part, "thought") and part.thought:
-                continue
-            if part.text is not None:
-                result_text += part.text
-            elif part.inline_data is not None:
-                result_image = part.as_image()
-
-    return result_image, result_text
+    return _collect_stream(stream, on_image)
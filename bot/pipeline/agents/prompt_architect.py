@@ -2,14 +2,28 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
+import hashlib
 import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
 
 import anthropic
-
-from bot.config import ANTHROPIC_API_KEY, CLAUDE_MODEL
-from bot.pipeline.brand_context import BRAND_SYSTEM_PROMPT, VARIANT_INSTRUCTIONS
-from bot.pipeline.models import PromptVariant, ResearchResult, VariantType
+import orjson
+
+from bot.config import CLAUDE_MODEL, NUM_VARIANTS, get_settings
+from bot.pipeline.brand_context import BRAND_SYSTEM_PROMPT, VARIANT_INSTRUCTIONS_BY_ENUM
+from bot.pipeline.models import (
+    VARIANT_BY_VALUE,
+    PromptVariant,
+    ResearchResult,
+    VariantType,
+    variant_order,
+)
+from bot.pipeline.utils import get_anthropic_client
+from bot.storage.cache import get_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +36,8 @@ the Gemini 3 Pro Image API. You create prompts for SOCIAL MEDIA AD STATICS
 (paid ad creatives), NOT simple product photos.
 
 ## Critical Rules
-1. Write exactly 6 prompts — one for each variant type (v1 through v6)
+1. Each request asks for ONE of the {NUM_VARIANTS} variant types (v1 through v{NUM_VARIANTS}) — write
+   exactly one prompt, for that variant only
 2. Each prompt must be 5-8 sentences of rich narrative description
 3. Every prompt MUST describe a COMPLETE AD STATIC containing:
    - Bold Swedish headline text at the top of the image
@@ -57,22 +72,21 @@ The v6 prompt MUST describe the reference image's layout in precise spatial deta
 (positions, sizes, arrangements) so that Gemini can replicate it accurately.
 """
 
-ARCHITECT_PROMPT = """\
-Create 6 social media ad static prompts for the Gemini 3 Pro Image API.
+_VARIANT_DEFS = "\n".join(
+    f"- **{vtype.value}**: {VARIANT_INSTRUCTIONS_BY_ENUM[vtype]}" for vtype in VariantType
+)
+
+# Static half of the user message: identical on every call, so it is sent as
+# its own content block and cached together with the system prompt.
+ARCHITECT_PROMPT_STATIC = """\
+We are creating {variant_count} social media ad static prompts for the Gemini 3 Pro
+Image API, one per variant below; each request asks for one of them.
 These are PAID AD CREATIVES, not product photos. Each must be a complete ad
 with headline, benefits, and CTA. ALL TEXT IN SWEDISH — no English anywhere.
 
-## User's Request
-{user_prompt}
-
-## Research Findings
-{research_context}
-
 ## Variant Definitions
 {variant_defs}
 
-{learning_context}
-
 ## Example of a Good Prompt (for reference only — do NOT copy)
 "Create a professional social media ad static for a Swedish dog supplement brand. \
 At the top of the image, display bold white headline text reading 'Ge din hund \
@@ -86,46 +100,106 @@ CTA banner with white text reading 'Mindre magproblem på 4-6 veckor'. Color pal
 forest green #2C5530, cream #FAF7F2, amber #C8924A accents."
 
 ## Output Format
-Return a JSON array with exactly 6 objects:
-```json
-[
-  {{
-    "variant_type": "v1-faithful",
-    "label": "Short descriptive label",
-    "narrative_prompt": "The full narrative prompt paragraph for Gemini...",
-    "rationale": "Why this variant approaches it this way"
-  }},
-  ...
-  {{
-    "variant_type": "v6-reference-copy",
-    "label": "Reference copy — ApotekHunden branded",
-    "narrative_prompt": "Near-identical recreation of the reference image...",
-    "rationale": "Direct adaptation of the reference with ApotekHunden branding"
-  }}
+Return a single JSON object for the requested variant:
+{{
+  "variant_type": "v1-faithful",
+  "label": "Short descriptive label",
+  "narrative_prompt": "The full narrative prompt paragraph for Gemini...",
+  "rationale": "Why this variant approaches it this way"
+}}
+""".format(variant_count=NUM_VARIANTS, variant_defs=_VARIANT_DEFS)
+
+
+def _dynamic_prompt(user_prompt: str, research_context: str, variant: str) -> str:
+    """Dynamic half of the user message: everything that changes per request goes last."""
+    return (
+        f"## User's Request\n{user_prompt}\n\n"
+        f"## Research Findings\n{research_context}\n\n"
+        f"## Your Variant\nWrite the prompt for **{variant}** only.\n"
+        "Return ONLY that JSON object, no other text.\n"
+    )
+
+
+_SYSTEM_BLOCKS = [
+    {"type": "text", "text": ARCHITECT_SYSTEM, "cache_control": {"type": "ephemeral"}},
 ]
-```
+_STATIC_BLOCK = {
+    "type": "text",
+    "text": ARCHITECT_PROMPT_STATIC,
+    "cache_control": {"type": "ephemeral"},
+}
+
+# Response-cache keys change whenever the model or any prompt text does
+_PROMPT_FINGERPRINT = hashlib.sha256(
+    (CLAUDE_MODEL + ARCHITECT_SYSTEM + ARCHITECT_PROMPT_STATIC + _dynamic_prompt("", "", "")).encode()
+).hexdigest()
 
-Return ONLY the JSON array, no other text.
-"""
+
+# Variants requested from the architect, one call each
+_VARIANTS = tuple(VariantType)[:NUM_VARIANTS]
+
+# Per-variant output budget: tuned from a sliding window of observed
+# output-token counts (p99 + headroom), never above the ceiling
+_MAX_TOKENS_CEILING = 1200
+_MAX_TOKENS_FLOOR = 400
+_MAX_TOKENS_MIN_SAMPLES = 20
+_output_tokens: deque[int] = deque(maxlen=200)
+
+# The schema is flat, so a newline + closing brace can only end the object
+_STOP_SEQUENCES = ["\n}"]
+
+# Anthropic's ephemeral cache lives ~5 minutes. While the prefix for a given
+# learning block is (probably) still cached, all variant calls fire at once;
+# when cold, one call writes the cache first and the rest then hit it.
+_PREFIX_TTL = 270.0
+# sha256 of the learning block → monotonic expiry; expired entries are pruned on insert
+_prefix_warm: dict[bytes, float] = {}
+
+
+def _mark_prefix_warm(key: bytes) -> None:
+    now = time.monotonic()
+    for k in [k for k, expiry in _prefix_warm.items() if expiry <= now]:
+        del _prefix_warm[k]
+    _prefix_warm[key] = now + _PREFIX_TTL
+
+_NO_LEARNING = "Ingen historisk feedback ännu — lita på din expertis."
 
 
 def build_learning_context(top_prompts: list[dict], limit: int = 5) -> str:
-    """Format top-performing prompts as learning context for the architect."""
+    """Format top-performing prompts as learning context for the architect.
+
+    Examples are ordered by identity rather than score, so the block (and the
+    prompt-cache prefix it sits in) only changes when the example set does.
+    """
     if not top_prompts:
-        return "Ingen historisk feedback ännu — lita på din expertis."
+        return _NO_LEARNING
+
+    examples = tuple(sorted(
+        (
+            ex.get("job_id", ""),
+            ex.get("variant", "N/A"),
+            ex.get("user_prompt", "N/A"),
+            (ex.get("prompt_text") or "")[:500],
+            bool(ex.get("selected")),
+        )
+        for ex in top_prompts[:limit]
+    ))
+    return _stable_learning_block(examples)
 
-    examples = top_prompts[:limit]
+
+@functools.lru_cache(maxsize=32)
+def _stable_learning_block(examples: tuple[tuple[str, str, str, str, bool], ...]) -> str:
     lines = ["## Framgångsrika exempel\n",
              "Dessa prompter har fått positiv feedback från användaren. "
              "Lär av deras stil, struktur och tillvägagångssätt:\n"]
 
-    for i, ex in enumerate(examples, 1):
-        selected_tag = " [VALD AV ANVÄNDAREN]" if ex.get("selected") else ""
+    for i, (_, variant, user_prompt, prompt_text, selected) in enumerate(examples, 1):
+        selected_tag = " [VALD AV ANVÄNDAREN]" if selected else ""
         lines.append(f"### Exempel {i}{selected_tag}")
-        lines.append(f"**Användarens prompt:** {ex.get('user_prompt', 'N/A')}")
-        lines.append(f"**Variant:** {ex.get('variant', 'N/A')}")
-        if ex.get("prompt_text"):
-            lines.append(f"**Framgångsrik bildprompt:** {ex['prompt_text'][:500]}")
+        lines.append(f"**Användarens prompt:** {user_prompt}")
+        lines.append(f"**Variant:** {variant}")
+        if prompt_text:
+            lines.append(f"**Framgångsrik bildprompt:** {prompt_text}")
         lines.append("")
 
     return "\n".join(lines)
@@ -135,8 +209,8 @@ async def run_prompt_architect(
     user_prompt: str,
     research: ResearchResult | None,
     learning_context: str = "",
-) -> list[PromptVariant]:
-    """Craft 6 narrative prompts using Claude."""
+) -> AsyncIterator[PromptVariant]:
+    """Craft NUM_VARIANTS narrative prompts using Claude, yielding each as soon as it is complete."""
 
     research_context = "No reference images analyzed."
     if research and research.raw_analysis:
@@ -148,71 +222,174 @@ async def run_prompt_architect(
             f"Key elements: {', '.join(research.key_elements)}"
         )
 
-    variant_defs = "\n".join(
-        f"- **{vtype}**: {desc}"
-        for vtype, desc in VARIANT_INSTRUCTIONS.items()
-    )
-
     if not learning_context:
-        learning_context = "Ingen historisk feedback ännu — lita på din expertis."
-
-    client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
-
-    response = await client.messages.create(
-        model=CLAUDE_MODEL,
-        max_tokens=4000,
-        system=ARCHITECT_SYSTEM,
-        messages=[{
-            "role": "user",
-            "content": ARCHITECT_PROMPT.format(
-                user_prompt=user_prompt,
-                research_context=research_context,
-                variant_defs=variant_defs,
-                learning_context=learning_context,
-            ),
-        }],
-    )
-
-    raw = response.content[0].text
-    logger.info("Prompt architect completed (%d chars)", len(raw))
-
-    return _parse_prompts(raw)
-
+        learning_context = _NO_LEARNING
+
+    cache_key = None
+    if get_settings().architect_cache_ttl > 0:
+        cache_key = get_response_cache().make_key(
+            "architect",
+            fp=_PROMPT_FINGERPRINT,
+            up=user_prompt,
+            rc=research_context,
+            lc=learning_context,
+        )
+        cached = await asyncio.to_thread(get_response_cache().get, cache_key)
+        if cached is not None:
+            logger.info("Prompt architect cache hit")
+            for item in orjson.loads(cached):
+                yield PromptVariant.model_validate(item)
+            return
+
+    client = get_anthropic_client()
+    learning_block = {
+        # Slow-changing, so it extends the cached prefix
+        "type": "text",
+        "text": learning_context,
+        "cache_control": {"type": "ephemeral"},
+    }
+
+    # One call per variant: they decode in parallel and share the cached prefix
+    def _start(vtype: VariantType, started: asyncio.Event | None = None) -> asyncio.Task:
+        return asyncio.create_task(_one_variant(
+            client, vtype, learning_block,
+            _dynamic_prompt(user_prompt, research_context, vtype.value),
+            started,
+        ))
 
-def _parse_prompts(raw: str) -> list[PromptVariant]:
-    """Parse JSON array of prompts from Claude's response."""
-    # Strip markdown code fences if present
-    text = raw.strip()
-    if text.startswith("```"):
-        lines = text.split("\n")
-        lines = lines[1:]  # drop opening fence
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        text = "\n".join(lines)
+    prefix_key = hashlib.sha256(learning_context.encode()).digest()
+    if _prefix_warm.get(prefix_key, 0.0) > time.monotonic():
+        tasks = [_start(vtype) for vtype in _VARIANTS]
+    else:
+        # Cold prefix: hold the rest back until the first response has begun,
+        # by which point its prefix is written to the cache
+        started = asyncio.Event()
+        tasks = [_start(_VARIANTS[0], started)]
+        waiter = asyncio.create_task(started.wait())
+        await asyncio.wait({tasks[0], waiter}, return_when=asyncio.FIRST_COMPLETED)
+        waiter.cancel()
+        tasks += [_start(vtype) for vtype in _VARIANTS[1:]]
+    _mark_prefix_warm(prefix_key)
+
+    variants: list[PromptVariant] = []
+    last_error: Exception | None = None
 
     try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        logger.error("Failed to parse prompt architect JSON: %s", text[:200])
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                variant = await next_done
+            except Exception as e:
+                logger.warning("Prompt architect call failed: %s", e)
+                last_error = e
+                continue
+            if variant is not None:
+                variants.append(variant)
+                yield variant
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    logger.info("Prompt architect completed (%d/%d variants)", len(variants), len(_VARIANTS))
+
+    if not variants and last_error is not None:
+        raise last_error
+    if not variants:
         raise ValueError("Prompt Architect returned invalid JSON")
+    if len(variants) != NUM_VARIANTS:
+        logger.warning("Expected %d variants, got %d", NUM_VARIANTS, len(variants))
+    elif cache_key is not None:
+        # Only complete sets are cached, in v1..v6 order so a hit replays that way
+        variants.sort(key=variant_order)
+        get_response_cache().set(
+            cache_key,
+            orjson.dumps([v.model_dump(mode="json") for v in variants]).decode(),
+            get_settings().architect_cache_ttl,
+        )
 
-    variants = []
-    for item in data:
-        vtype = item.get("variant_type", "")
-        try:
-            variant_enum = VariantType(vtype)
-        except ValueError:
-            logger.warning("Unknown variant type: %s, skipping", vtype)
-            continue
-
-        variants.append(PromptVariant(
-            variant_type=variant_enum,
-            label=item.get("label", vtype),
-            narrative_prompt=item.get("narrative_prompt", ""),
-            rationale=item.get("rationale", ""),
-        ))
 
-    if len(variants) != 6:
-        logger.warning("Expected 6 variants, got %d", len(variants))
+def _adaptive_max_tokens() -> int:
+    """p99 of recent output-token counts plus 25% headroom, clamped."""
+    if len(_output_tokens) < _MAX_TOKENS_MIN_SAMPLES:
+        return _MAX_TOKENS_CEILING
+    ordered = sorted(_output_tokens)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return max(_MAX_TOKENS_FLOOR, min(_MAX_TOKENS_CEILING, int(p99 * 1.25)))
+
+
+async def _one_variant(
+    client: anthropic.AsyncAnthropic,
+    vtype: VariantType,
+    learning_block: dict,
+    dynamic_prompt: str,
+    started: asyncio.Event | None = None,
+) -> PromptVariant | None:
+    """Ask Claude for a single variant's prompt object.
+
+    ``started`` is set once the response stream opens (the prompt has been
+    processed and its cacheable prefix written).
+    """
+
+    # Prefill: the reply continues inside the object, with the type already fixed
+    prefill = f'{{"variant_type": "{vtype.value}",'
+    messages = [{
+        "role": "user",
+        "content": [
+            _STATIC_BLOCK,
+            learning_block,
+            {"type": "text", "text": dynamic_prompt},
+        ],
+    }, {
+        "role": "assistant",
+        "content": prefill,
+    }]
+
+    max_tokens = _adaptive_max_tokens()
+    while True:
+        async with client.messages.stream(
+            model=CLAUDE_MODEL,
+            service_tier=get_settings().claude_service_tier,
+            max_tokens=max_tokens,
+            stop_sequences=_STOP_SEQUENCES,
+            system=_SYSTEM_BLOCKS,
+            messages=messages,
+        ) as stream:
+            if started is not None:
+                started.set()
+            response = await stream.get_final_message()
+        if response.stop_reason != "max_tokens" or max_tokens >= _MAX_TOKENS_CEILING:
+            break
+        # The tuned budget was too tight for this one — retry at the ceiling
+        logger.info(
+            "Architect %s hit max_tokens=%d, retrying at %d",
+            vtype.value, max_tokens, _MAX_TOKENS_CEILING,
+        )
+        max_tokens = _MAX_TOKENS_CEILING
+
+    text = prefill + response.content[0].text
+    if response.stop_reason == "stop_sequence":
+        text += "\n}"
+    if response.stop_reason != "max_tokens":
+        _output_tokens.append(response.usage.output_tokens)
+    return _parse_variant(text)
 
-    return variants
+
+def _parse_variant(text: str) -> PromptVariant | None:
+    """Parse one prompt object; None if it is malformed or unknown."""
+    try:
+        item = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        logger.error("Failed to parse prompt architect JSON: %s", text[:200])
+        return None
+
+    vtype = item.get("variant_type", "")
+    variant_enum = VARIANT_BY_VALUE.get(vtype)
+    if variant_enum is None:
+        logger.warning("Unknown variant type: %s, skipping", vtype)
+        return None
+
+    return PromptVariant(
+        variant_type=variant_enum,
+        label=item.get("label", vtype),
+        narrative_prompt=item.get("narrative_prompt", ""),
+        rationale=item.get("rationale", ""),
+    )
@@ -2,15 +2,14 @@
 
 from __future__ import annotations
 
-import base64
+import asyncio
 import logging
+import re
 from pathlib import Path
 
-import anthropic
-
-from bot.config import ANTHROPIC_API_KEY, CLAUDE_MODEL
+from bot.config import CLAUDE_MODEL, get_settings
 from bot.pipeline.models import ResearchResult
-from bot.pipeline.utils import detect_media_type
+from bot.pipeline.utils import get_anthropic_client, read_image_b64
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +37,19 @@ Provide your analysis in this exact structure:
 **Key Elements:** List the most important visual elements that should be preserved or referenced.
 """
 
+def _load_and_encode(img_path: str) -> dict | None:
+    """Reference image as an image content block. Runs in a worker thread."""
+    blob = read_image_b64(Path(img_path))
+    if blob is None:
+        logger.warning("Reference image not found: %s", img_path)
+        return None
+
+    media_type, data = blob
+    return {
+        "type": "image",
+        "source": {"type": "base64", "media_type": media_type, "data": data},
+    }
+
 
 async def run_research(
     user_prompt: str,
@@ -51,23 +63,12 @@ async def run_research(
             raw_analysis="No reference images provided. Proceeding with prompt-only generation.",
         )
 
-    client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
-
-    content: list[dict] = []
-    for img_path in reference_image_paths:
-        path = Path(img_path)
-        if not path.exists():
-            logger.warning("Reference image not found: %s", img_path)
-            continue
-
-        raw_bytes = path.read_bytes()
-        media_type = detect_media_type(raw_bytes, path.suffix)
-        data = base64.standard_b64encode(raw_bytes).decode()
+    client = get_anthropic_client()
 
-        content.append({
-            "type": "image",
-            "source": {"type": "base64", "media_type": media_type, "data": data},
-        })
+    blocks = await asyncio.gather(*[
+        asyncio.to_thread(_load_and_encode, p) for p in reference_image_paths
+    ])
+    content: list[dict] = [b for b in blocks if b is not None]
 
     content.append({
         "type": "text",
@@ -76,6 +77,7 @@ async def run_research(
 
     response = await client.messages.create(
         model=CLAUDE_MODEL,
+        service_tier=get_settings().claude_service_tier,
         max_tokens=1500,
         system=RESEARCH_SYSTEM,
         messages=[{"role": "user", "content": content}],
@@ -87,66 +89,43 @@ async def run_research(
     return _parse_research(raw)
 
 
+_SECTION_RE = re.compile(
+    r"^[ \t#]*\*{0,2}[ \t]*(style analysis|color palette|composition(?: notes?)?|mood|key elements)"
+    r"[ \t]*:?[ \t]*\*{0,2}[ \t]*:?[ \t]*",
+    re.MULTILINE | re.IGNORECASE,
+)
+
+# Header's first word → ResearchResult field
+_SECTION_KEYS = {
+    "style": "style_analysis",
+    "color": "color_palette",
+    "composition": "composition_notes",
+    "mood": "mood",
+    "key": "key_elements",
+}
+
+
 def _parse_research(raw: str) -> ResearchResult:
     """Best-effort parse of structured analysis."""
-    sections = {
-        "style_analysis": "",
-        "color_palette": [],
-        "composition_notes": "",
-        "mood": "",
-        "key_elements": [],
-    }
+    sections: dict[str, list[str]] = {key: [] for key in _SECTION_KEYS.values()}
+
+    # [preamble, header1, body1, header2, body2, ...]
+    parts = _SECTION_RE.split(raw)
+    for header, body in zip(parts[1::2], parts[2::2]):
+        key = _SECTION_KEYS[header.split(" ", 1)[0].lower()]
+        for line in body.splitlines():
+            stripped = line.strip().lstrip("- •*").strip()
+            if stripped:
+                sections[key].append(stripped)
 
-    current_key = None
-    lines = raw.split("\n")
-
-    for line in lines:
-        lower = line.lower().strip()
-        if "style analysis" in lower:
-            current_key = "style_analysis"
-            parts = line.split(":", 1)
-            if len(parts) > 1 and parts[1].strip():
-                sections["style_analysis"] = parts[1].strip()
-            continue
-        elif "color palette" in lower:
-            current_key = "color_palette"
-            continue
-        elif "composition" in lower:
-            current_key = "composition_notes"
-            parts = line.split(":", 1)
-            if len(parts) > 1 and parts[1].strip():
-                sections["composition_notes"] = parts[1].strip()
-            continue
-        elif "mood" in lower and "**" in line:
-            current_key = "mood"
-            parts = line.split(":", 1)
-            if len(parts) > 1 and parts[1].strip():
-                sections["mood"] = parts[1].strip()
-            continue
-        elif "key elements" in lower:
-            current_key = "key_elements"
-            continue
-
-        stripped = line.strip().lstrip("- •*").strip()
-        if not stripped:
-            continue
-
-        if current_key == "color_palette":
-            sections["color_palette"].append(stripped)
-        elif current_key == "key_elements":
-            sections["key_elements"].append(stripped)
-        elif current_key == "style_analysis":
-            sections["style_analysis"] += " " + stripped
-        elif current_key == "composition_notes":
-            sections["composition_notes"] += " " + stripped
-        elif current_key == "mood":
-            sections["mood"] += " " + stripped
+    def text(key: str) -> str:
+        return " ".join(sections[key])
 
     return ResearchResult(
-        style_analysis=sections["style_analysis"].strip(),
+        style_analysis=text("style_analysis"),
         color_palette=sections["color_palette"],
-        composition_notes=sections["composition_notes"].strip(),
-        mood=sections["mood"].strip(),
+        composition_notes=text("composition_notes"),
+        mood=text("mood"),
         key_elements=sections["key_elements"],
         raw_analysis=raw,
     )
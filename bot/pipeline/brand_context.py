@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+from types import MappingProxyType
+
+from bot.pipeline.models import VariantType
+
 BRAND_SYSTEM_PROMPT = """\
 You are a creative director for ApotekHunden, a premium Swedish pet supplement brand.
 You specialize in creating social media ad statics (paid ad creatives) — NOT just
@@ -106,3 +110,11 @@ VARIANT_INSTRUCTIONS = {
         "image structure, just re-branded for ApotekHunden with Swedish text."
     ),
 }
+
+# Enum-keyed, read-only view; a missing or misspelled variant fails at import
+VARIANT_INSTRUCTIONS_BY_ENUM: MappingProxyType[VariantType, str] = MappingProxyType({
+    VariantType(k): v for k, v in VARIANT_INSTRUCTIONS.items()
+})
+# Checked explicitly rather than with assert, which ``python -O`` strips
+if set(VARIANT_INSTRUCTIONS_BY_ENUM) != set(VariantType):
+    raise RuntimeError("VARIANT_INSTRUCTIONS out of sync with VariantType")
@@ -3,15 +3,24 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import contextvars
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Callable, Coroutine
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+_UTC = timezone.utc
+_now = datetime.now
+
+
+def _timestamp() -> str:
+    return _now(_UTC).isoformat(timespec="milliseconds")
+
 
 class EventType(str, Enum):
     # Pipeline lifecycle
@@ -24,6 +33,7 @@ class EventType(str, Enum):
     AGENT_MESSAGE = "agent_message"
     IMAGE_GENERATED = "image_generated"
     VARIANT_SCORED = "variant_scored"
+    VARIANTS_SCORED_BATCH = "variants_scored_batch"
 
     # Refinement
     IMAGE_REFINED = "image_refined"
@@ -32,51 +42,114 @@ class EventType(str, Enum):
     PROGRESS = "progress"
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     type: EventType
     job_id: str
     data: dict[str, Any] = field(default_factory=dict)
-    timestamp: str = field(
-        default_factory=lambda: datetime.now(timezone.utc).isoformat()
-    )
+    timestamp: str = field(default_factory=_timestamp)
+    _payload: bytes | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def payload_bytes(self) -> bytes:
+        """JSON wire form, serialized once per event however many subscribers read it."""
+        if self._payload is None:
+            self._payload = orjson.dumps({
+                "type": self.type.value,
+                "job_id": self.job_id,
+                "data": self.data,
+                "timestamp": self.timestamp,
+            })
+        return self._payload
 
     def to_json(self) -> str:
-        return json.dumps({
-            "type": self.type.value,
-            "job_id": self.job_id,
-            "data": self.data,
-            "timestamp": self.timestamp,
-        })
+        return self.payload_bytes.decode()
 
 
 # Subscriber = async callable that receives an Event
 Subscriber = Callable[[Event], Coroutine[Any, Any, None]]
 
+# Seconds a single subscriber may take to handle one event
+SUBSCRIBER_TIMEOUT = 2.0
+
+# Events buffered for delivery before post() starts dropping
+QUEUE_SIZE = 1024
+
+# Set while the consumer is delivering; subscribers (and tasks they spawn) inherit it
+_delivering: contextvars.ContextVar[bool] = contextvars.ContextVar("_delivering", default=False)
+
 
 class EventBus:
-    """Simple pub/sub bus. Subscribers receive all events."""
+    """Simple pub/sub bus. Subscribers receive all events.
+
+    Events go through one FIFO queue drained by a background task, so
+    ``post`` never blocks the publisher and delivery order is preserved
+    whether an event was posted or awaited with ``emit_async``.
+    """
 
     def __init__(self) -> None:
-        self._subscribers: list[Subscriber] = []
+        # Copy-on-write: (un)subscribe swap in a new tuple, emit reads it lock-free
+        self._subscribers: tuple[Subscriber, ...] = ()
         self._lock = asyncio.Lock()
+        self._queue: asyncio.Queue[tuple[Event, asyncio.Future | None]] = asyncio.Queue(
+            maxsize=QUEUE_SIZE,
+        )
+        self._consumer_task: asyncio.Task | None = None
 
     async def subscribe(self, callback: Subscriber) -> None:
         async with self._lock:
-            self._subscribers.append(callback)
+            self._subscribers = self._subscribers + (callback,)
 
     async def unsubscribe(self, callback: Subscriber) -> None:
         async with self._lock:
-            self._subscribers = [s for s in self._subscribers if s is not callback]
-
-    async def emit(self, event: Event) -> None:
-        async with self._lock:
-            subs = list(self._subscribers)
-        for sub in subs:
+            self._subscribers = tuple(s for s in self._subscribers if s is not callback)
+
+    def post(self, event: Event) -> None:
+        """Queue an event for delivery and return immediately."""
+        self._ensure_consumer()
+        try:
+            self._queue.put_nowait((event, None))
+        except asyncio.QueueFull:
+            logger.warning("EventBus queue full — dropping %s for job %s", event.type.value, event.job_id)
+
+    async def emit_async(self, event: Event) -> None:
+        """Queue an event and wait until every subscriber has handled it."""
+        if _delivering.get():
+            # Called from a subscriber: the consumer is busy awaiting us, so
+            # queueing would never drain — deliver inline instead
+            await self._deliver(event)
+            return
+        self._ensure_consumer()
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put((event, done))
+        await done
+
+    def _ensure_consumer(self) -> None:
+        if self._consumer_task is None or self._consumer_task.done():
+            self._consumer_task = asyncio.get_running_loop().create_task(self._consumer())
+
+    async def _consumer(self) -> None:
+        _delivering.set(True)
+        while True:
+            event, done = await self._queue.get()
             try:
-                await sub(event)
-            except Exception:
-                logger.exception("EventBus subscriber error")
+                await self._deliver(event)
+            finally:
+                if done is not None and not done.done():
+                    done.set_result(None)
+
+    async def _deliver(self, event: Event) -> None:
+        subs = self._subscribers
+        # Deliver concurrently; a hung subscriber is cut off after the timeout
+        results = await asyncio.gather(
+            *(asyncio.wait_for(sub(event), SUBSCRIBER_TIMEOUT) for sub in subs),
+            return_exceptions=True,
+        )
+        for sub, res in zip(subs, results):
+            if isinstance(res, asyncio.TimeoutError):
+                logger.warning("EventBus subscriber %r timed out on %s", sub, event.type.value)
+            elif isinstance(res, Exception):
+                logger.error("EventBus subscriber error", exc_info=res)
 
 
 # Singleton
@@ -5,6 +5,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -32,6 +33,19 @@ class VariantType(str, Enum):
     REFERENCE_COPY = "v6-reference-copy"
 
 
+# Value → member lookup without Enum.__call__ / exception overhead
+VARIANT_BY_VALUE: dict[str, VariantType] = {v.value: v for v in VariantType}
+
+# Declaration order (v1..v6), for putting results back in order after they
+# finish out of order
+_VARIANT_INDEX: dict[VariantType, int] = {v: i for i, v in enumerate(VariantType)}
+
+
+def variant_order(item: GeneratedImage | PromptVariant) -> int:
+    """Sort key placing prompts / images in v1..v6 order."""
+    return _VARIANT_INDEX[item.variant_type]
+
+
 # ── Pipeline Request ───────────────────────────────────────────────
 
 class PipelineRequest(BaseModel):
@@ -125,3 +139,15 @@ class PipelineResult(BaseModel):
     error: Optional[str] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    # Images with a file on disk, filled in once by run_pipeline; not persisted
+    successful_images: list[GeneratedImage] = Field(default_factory=list, exclude=True)
+
+    # Built on first access; for read paths on stored jobs, whose images and
+    # prompts are not reassigned afterwards
+    @cached_property
+    def images_by_variant(self) -> dict[str, GeneratedImage]:
+        return {img.variant_type.value: img for img in self.images}
+
+    @cached_property
+    def prompts_by_variant(self) -> dict[str, PromptVariant]:
+        return {p.variant_type.value: p for p in self.prompts}
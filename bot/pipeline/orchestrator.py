@@ -2,20 +2,101 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 from datetime import datetime, timezone
+from pathlib import Path
 
+from bot.config import NUM_VARIANTS, get_settings
 from bot.pipeline.agents.critic import run_critic
-from bot.pipeline.agents.generator import run_generator
+from bot.pipeline.agents.generator import prepare_references, release_references, run_generator
 from bot.pipeline.agents.prompt_architect import build_learning_context, run_prompt_architect
 from bot.pipeline.agents.research import run_research
 from bot.pipeline.events import Event, EventType, event_bus
-from bot.pipeline.models import PipelineRequest, PipelineResult, PipelineStage
-from bot.storage.jobs import job_store
+from bot.pipeline.models import (
+    GeneratedImage,
+    PipelineRequest,
+    PipelineResult,
+    PipelineStage,
+    variant_order,
+)
+from bot.pipeline.utils import link_or_copy, read_image_b64
+from bot.storage.cache import get_response_cache
+from bot.storage.jobs import get_job_store
 
 logger = logging.getLogger(__name__)
 
 
+def _load_learning_context() -> str:
+    """Top-rated prompts formatted for the architect (blocking DB read)."""
+    return build_learning_context(get_job_store().get_top_performing_prompts(limit=10), limit=5)
+
+
+def _pipeline_cache_key(request: PipelineRequest) -> str:
+    """Exact-match key over the normalized prompt, output settings and reference contents (blocking)."""
+    ref_hashes = sorted(
+        hashlib.sha256(Path(p).read_bytes()).hexdigest()
+        for p in request.reference_image_paths if Path(p).exists()
+    )
+    return get_response_cache().make_key(
+        "pipeline",
+        up=" ".join(request.user_prompt.lower().split()),
+        ar=request.aspect_ratio,
+        res=request.resolution,
+        refs=ref_hashes,
+    )
+
+
+def _clone_cached(result: PipelineResult, prior_job_id: str) -> bool:
+    """Fill result from a prior completed job, linking its images into this job's dir (blocking)."""
+    prior = get_job_store().get(prior_job_id)
+    if prior is None or prior.stage != PipelineStage.COMPLETE:
+        return False
+
+    job_dir = get_settings().outputs_dir / result.job_id
+    job_dir.mkdir(parents=True, exist_ok=True)
+    images = []
+    for img in prior.images:
+        if img.success and img.file_path:
+            src = Path(img.file_path)
+            dst = job_dir / src.name
+            if not link_or_copy(src, dst):
+                return False
+            img = img.model_copy(update={"file_path": str(dst)})
+        images.append(img)
+
+    result.research = prior.research
+    result.prompts = prior.prompts
+    result.images = images
+    result.evaluation = prior.evaluation
+    return True
+
+
+def _successful(images: list[GeneratedImage]) -> list[GeneratedImage]:
+    return [img for img in images if img.success and img.file_path]
+
+
+async def _complete(result: PipelineResult) -> PipelineResult:
+    """Mark the job complete, persist it and announce it."""
+    result.stage = PipelineStage.COMPLETE
+    result.completed_at = datetime.now(timezone.utc)
+    result.successful_images = _successful(result.images)
+    await asyncio.wrap_future(get_job_store().update_result(result))
+
+    await event_bus.emit_async(Event(
+        type=EventType.JOB_COMPLETED,
+        job_id=result.job_id,
+        data={
+            "successful_images": len(result.successful_images),
+            "winner": result.evaluation.winner.value if result.evaluation and result.evaluation.winner else None,
+        },
+    ))
+
+    logger.info("Pipeline completed for job %s", result.job_id)
+    return result
+
+
 async def run_pipeline(request: PipelineRequest) -> PipelineResult:
     """Execute the full 4-agent pipeline for a single request."""
 
@@ -25,23 +106,40 @@ async def run_pipeline(request: PipelineRequest) -> PipelineResult:
         stage=PipelineStage.QUEUED,
         started_at=datetime.now(timezone.utc),
     )
-    job_store.create(result)
+    get_job_store().create(result)
 
-    await event_bus.emit(Event(
+    event_bus.post(Event(
         type=EventType.JOB_STARTED,
         job_id=request.job_id,
         data={"prompt": request.user_prompt},
     ))
 
+    refs_task = None
     try:
+        cache_key = None
+        if get_settings().pipeline_cache_ttl > 0:
+            cache_key = await asyncio.to_thread(_pipeline_cache_key, request)
+            prior_job_id = await asyncio.to_thread(get_response_cache().get, cache_key)
+            if prior_job_id and await asyncio.to_thread(_clone_cached, result, prior_job_id):
+                logger.info("Pipeline cache hit for job %s (from %s)", request.job_id, prior_job_id)
+                return await _complete(result)
+
+        # The learning-context lookup doesn't depend on research, so it runs
+        # in a worker thread while Claude analyzes the reference images.
+        learning_task = asyncio.create_task(asyncio.to_thread(_load_learning_context))
+        # Likewise reading the reference images for Gemini (and uploading them
+        # to its context cache) only needs the request
+        refs_task = asyncio.create_task(prepare_references(request.reference_image_paths))
+
         # ── Stage 1: Research ──────────────────────────────────────
         result.stage = PipelineStage.RESEARCH
-        await event_bus.emit(Event(
+        get_job_store().update_stage(request.job_id, PipelineStage.RESEARCH.value)
+        event_bus.post(Event(
             type=EventType.STAGE_CHANGED,
             job_id=request.job_id,
             data={"stage": PipelineStage.RESEARCH.value},
         ))
-        await event_bus.emit(Event(
+        event_bus.post(Event(
             type=EventType.AGENT_MESSAGE,
             job_id=request.job_id,
             data={"agent": "research", "message": "Analyzing reference images..."},
@@ -52,9 +150,9 @@ async def run_pipeline(request: PipelineRequest) -> PipelineResult:
             reference_image_paths=request.reference_image_paths,
         )
         result.research = research
-        job_store.update_result(result)
+        get_job_store().update_result(result)
 
-        await event_bus.emit(Event(
+        event_bus.post(Event(
             type=EventType.AGENT_MESSAGE,
             job_id=request.job_id,
             data={
@@ -66,57 +164,77 @@ async def run_pipeline(request: PipelineRequest) -> PipelineResult:
 
         # ── Stage 2: Prompt Crafting ───────────────────────────────
         result.stage = PipelineStage.PROMPT_CRAFTING
-        await event_bus.emit(Event(
+        get_job_store().update_stage(request.job_id, PipelineStage.PROMPT_CRAFTING.value)
+        event_bus.post(Event(
             type=EventType.STAGE_CHANGED,
             job_id=request.job_id,
             data={"stage": PipelineStage.PROMPT_CRAFTING.value},
         ))
-        await event_bus.emit(Event(
+        event_bus.post(Event(
             type=EventType.AGENT_MESSAGE,
             job_id=request.job_id,
-            data={"agent": "prompt_architect", "message": "Crafting 6 narrative prompts..."},
+            data={"agent": "prompt_architect", "message": f"Crafting {NUM_VARIANTS} narrative prompts..."},
         ))
 
-        top_prompts = job_store.get_top_performing_prompts(limit=10)
-        learning_ctx = build_learning_context(top_prompts, limit=5)
+        learning_ctx = await learning_task
 
-        prompts = await run_prompt_architect(
-            user_prompt=request.user_prompt,
-            research=research,
-            learning_context=learning_ctx,
-        )
-        result.prompts = prompts
-        job_store.update_result(result)
+        # ── Stage 3: Image Generation ─────────────────────────────
+        # Prompts stream out of the architect; each one starts generating as
+        # soon as it arrives, so stages 2 and 3 overlap.
+        async def _stream_prompts():
+            async for variant in run_prompt_architect(
+                user_prompt=request.user_prompt,
+                research=research,
+                learning_context=learning_ctx,
+            ):
+                if not result.prompts:
+                    result.stage = PipelineStage.GENERATING
+                    get_job_store().update_stage(request.job_id, PipelineStage.GENERATING.value)
+                    event_bus.post(Event(
+                        type=EventType.STAGE_CHANGED,
+                        job_id=request.job_id,
+                        data={"stage": PipelineStage.GENERATING.value},
+                    ))
+                result.prompts.append(variant)
+                yield variant
 
-        await event_bus.emit(Event(
-            type=EventType.AGENT_MESSAGE,
-            job_id=request.job_id,
-            data={
-                "agent": "prompt_architect",
-                "message": f"Created {len(prompts)} prompt variants.",
-            },
-        ))
+            # Variants arrive in completion order; store them v1..v6
+            result.prompts.sort(key=variant_order)
+            get_job_store().update_result(result)
+            event_bus.post(Event(
+                type=EventType.AGENT_MESSAGE,
+                job_id=request.job_id,
+                data={
+                    "agent": "prompt_architect",
+                    "message": f"Created {len(result.prompts)} prompt variants.",
+                },
+            ))
 
-        # ── Stage 3: Image Generation ─────────────────────────────
-        result.stage = PipelineStage.GENERATING
-        await event_bus.emit(Event(
-            type=EventType.STAGE_CHANGED,
-            job_id=request.job_id,
-            data={"stage": PipelineStage.GENERATING.value},
-        ))
+        # Each finished image is read and base64-encoded for the critic right
+        # away (read_image_b64 is memoized), overlapping the slower variants
+        encode_tasks: list[asyncio.Task] = []
+
+        def _prefetch_for_critic(img: GeneratedImage) -> None:
+            encode_tasks.append(asyncio.create_task(
+                asyncio.to_thread(read_image_b64, Path(img.file_path))
+            ))
 
         images = await run_generator(
             job_id=request.job_id,
-            prompts=prompts,
+            prompts=_stream_prompts(),
             aspect_ratio=request.aspect_ratio,
             resolution=request.resolution,
             reference_image_paths=request.reference_image_paths,
+            references=refs_task,
+            on_result=_prefetch_for_critic,
         )
+        await asyncio.gather(*encode_tasks, return_exceptions=True)
         result.images = images
-        job_store.update_result(result)
+        result.successful_images = _successful(images)
+        get_job_store().update_result(result)
 
-        successful = sum(1 for img in images if img.success)
-        await event_bus.emit(Event(
+        successful = len(result.successful_images)
+        event_bus.post(Event(
             type=EventType.AGENT_MESSAGE,
             job_id=request.job_id,
             data={
@@ -128,7 +246,8 @@ async def run_pipeline(request: PipelineRequest) -> PipelineResult:
         # ── Stage 4: Evaluation ────────────────────────────────────
         if successful > 0:
             result.stage = PipelineStage.EVALUATING
-            await event_bus.emit(Event(
+            get_job_store().update_stage(request.job_id, PipelineStage.EVALUATING.value)
+            event_bus.post(Event(
                 type=EventType.STAGE_CHANGED,
                 job_id=request.job_id,
                 data={"stage": PipelineStage.EVALUATING.value},
@@ -140,9 +259,9 @@ async def run_pipeline(request: PipelineRequest) -> PipelineResult:
                 images=images,
             )
             result.evaluation = evaluation
-            job_store.update_result(result)
+            get_job_store().update_result(result)
 
-            await event_bus.emit(Event(
+            event_bus.post(Event(
                 type=EventType.AGENT_MESSAGE,
                 job_id=request.job_id,
                 data={
@@ -152,29 +271,19 @@ async def run_pipeline(request: PipelineRequest) -> PipelineResult:
             ))
 
         # ── Complete ───────────────────────────────────────────────
-        result.stage = PipelineStage.COMPLETE
-        result.completed_at = datetime.now(timezone.utc)
-        job_store.update_result(result)
-
-        await event_bus.emit(Event(
-            type=EventType.JOB_COMPLETED,
-            job_id=request.job_id,
-            data={
-                "successful_images": successful,
-                "winner": result.evaluation.winner.value if result.evaluation and result.evaluation.winner else None,
-            },
-        ))
-
-        logger.info("Pipeline completed for job %s", request.job_id)
+        await _complete(result)
+        if cache_key is not None and successful > 0:
+            get_response_cache().set(cache_key, request.job_id, get_settings().pipeline_cache_ttl)
         return result
 
     except Exception as e:
         result.stage = PipelineStage.FAILED
         result.error = str(e)
         result.completed_at = datetime.now(timezone.utc)
-        job_store.update_result(result)
+        get_job_store().update_result(result)
+        await get_job_store().flush_async()
 
-        await event_bus.emit(Event(
+        await event_bus.emit_async(Event(
             type=EventType.JOB_FAILED,
             job_id=request.job_id,
             data={"error": str(e)},
@@ -182,3 +291,7 @@ async def run_pipeline(request: PipelineRequest) -> PipelineResult:
 
         logger.exception("Pipeline failed for job %s", request.job_id)
         return result
+
+    finally:
+        if refs_task is not None:
+            await release_references(refs_task)
@@ -2,24 +2,142 @@
 
 from __future__ import annotations
 
+import functools
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import anthropic
+import pybase64
+
+from bot.config import get_settings
+
+
+@functools.lru_cache(maxsize=1)
+def get_anthropic_client() -> anthropic.AsyncAnthropic:
+    """Process-wide Claude client shared by research, architect and critic."""
+    return anthropic.AsyncAnthropic(api_key=get_settings().anthropic_api_key, max_retries=2, timeout=60.0)
+
+
+async def close_anthropic_client() -> None:
+    """Close the shared Claude client if it was ever created."""
+    if get_anthropic_client.cache_info().currsize:
+        await get_anthropic_client().close()
+        get_anthropic_client.cache_clear()
+
+
+# First four bytes → MIME type (RIFF still needs the WEBP tag at offset 8)
+_MAGIC = {
+    b"\x89PNG": "image/png",
+    b"GIF8": "image/gif",
+    b"RIFF": "image/webp",
+}
+
+_SUFFIX_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "gif": "image/gif",
+}
+
 
 def detect_media_type(data: bytes, suffix_hint: str = "") -> str:
     """Detect image MIME type from file bytes (magic number), with suffix fallback."""
-    if data[:8] == b'\x89PNG\r\n\x1a\n':
-        return "image/png"
-    if data[:2] == b'\xff\xd8':
+    mt = _MAGIC.get(data[:4])
+    if mt is not None and (mt != "image/webp" or data[8:12] == b"WEBP"):
+        return mt
+    if data[:2] == b"\xff\xd8":
         return "image/jpeg"
-    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
-        return "image/webp"
-    if data[:6] in (b'GIF87a', b'GIF89a'):
-        return "image/gif"
 
     # Fallback to suffix
-    ext = suffix_hint.lower().lstrip(".")
-    return {
-        "png": "image/png",
-        "jpg": "image/jpeg",
-        "jpeg": "image/jpeg",
-        "webp": "image/webp",
-        "gif": "image/gif",
-    }.get(ext, "image/jpeg")  # Default to JPEG (most common)
+    return _SUFFIX_TYPES.get(suffix_hint.lower().lstrip("."), "image/jpeg")  # Default to JPEG (most common)
+
+
+# Bytes of base64 kept by the encode cache; one 2K image is several MB
+_ENCODE_CACHE_BYTES = 64 << 20
+_encode_cache: OrderedDict[tuple[str, int, int], tuple[str, str]] = OrderedDict()
+_encode_cache_size = 0
+_encode_lock = threading.Lock()
+
+
+def _encode_image(path_str: str, mtime_ns: int, size: int) -> tuple[str, str]:
+    """Read and base64-encode an image file.
+
+    Memoized on (path, mtime, size) so repeat evaluations of the same file
+    skip both the disk read and the encode, while edits invalidate the entry.
+    The cache is bounded by total encoded size rather than entry count.
+    """
+    global _encode_cache_size
+    key = (path_str, mtime_ns, size)
+    with _encode_lock:
+        hit = _encode_cache.get(key)
+        if hit is not None:
+            _encode_cache.move_to_end(key)
+            return hit
+
+    path = Path(path_str)
+    raw_bytes = path.read_bytes()
+    encoded = (
+        detect_media_type(raw_bytes, path.suffix),
+        pybase64.b64encode(raw_bytes).decode("ascii"),
+    )
+    cost = len(encoded[1])
+    if cost > _ENCODE_CACHE_BYTES:
+        return encoded
+
+    with _encode_lock:
+        if key not in _encode_cache:
+            _encode_cache[key] = encoded
+            _encode_cache_size += cost
+        while _encode_cache_size > _ENCODE_CACHE_BYTES:
+            _, (_, old) = _encode_cache.popitem(last=False)
+            _encode_cache_size -= len(old)
+    return encoded
+
+
+def read_image_b64(path: Path) -> tuple[str, str] | None:
+    """(media_type, base64) for an image, or None if it is gone. Blocking — run in a thread."""
+    try:
+        st = path.stat()
+        return _encode_image(str(path), st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+def link_or_copy(src: Path, dst: Path) -> bool:
+    """Hard-link src to dst (copy across filesystems); False if src is gone. Blocking.
+
+    The link or copy lands on a temporary name beside ``dst`` and is renamed
+    over it, so an existing ``dst`` is never lost, even when it is ``src``.
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if dst.exists() and os.path.samefile(src, dst):
+            return True
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    except FileNotFoundError:
+        return False
+    finally:
+        tmp.unlink(missing_ok=True)
+    return True
+
+
+@functools.cache
+def _outputs_prefix() -> str:
+    return f"{get_settings().outputs_dir}/"
+
+
+def output_relative(path: str) -> str:
+    """Path below the outputs dir (as served at /outputs/), or ``path`` unchanged."""
+    prefix = _outputs_prefix()
+    if path.startswith(prefix):
+        return path[len(prefix):]
+    # Written under a different OUTPUTS_DIR: fall back to the URL segment
+    return path.rpartition("/outputs/")[2]
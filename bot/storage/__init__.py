@@ -0,0 +1,61 @@
+"""SQLite-backed stores sharing one database file."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable
+
+from bot.config import get_settings
+
+# A write: runs on the job store writer thread's connection
+WriteOp = Callable[[sqlite3.Connection], None]
+
+
+def db_path() -> Path:
+    """The SQLite file every store shares (under DATA_DIR)."""
+    return get_settings().data_dir / "banana_squad.db"
+
+
+class ThreadLocalSqlite(ABC):
+    """Base for small stores that read over one SQLite connection per thread.
+
+    Writes go through ``write`` — the job store's writer thread, which owns
+    the only read-write connection to the shared file — so these stores never
+    contend with it for the write lock. Subclasses create their tables in
+    ``_init_schema``.
+    """
+
+    def __init__(self, db_path: Path, write: Callable[[WriteOp], Future]) -> None:
+        self._db_path = db_path
+        self._write = write
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        # journal_mode=WAL persists in the database file, so it and the schema
+        # are set up once here rather than on every per-thread connection
+        bootstrap = sqlite3.connect(str(db_path))
+        try:
+            bootstrap.execute("PRAGMA journal_mode=WAL")
+            self._init_schema(bootstrap)
+        finally:
+            bootstrap.close()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (SQLite requirement)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    @abstractmethod
+    def _init_schema(conn: sqlite3.Connection) -> None:
+        """Create tables and indexes; runs once on the bootstrap connection."""
@@ -0,0 +1,69 @@
+"""Response cache — exact-match, TTL-bounded, SQLite-backed."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import sqlite3
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+import orjson
+
+from bot.storage import ThreadLocalSqlite, db_path
+from bot.storage.jobs import get_job_store
+
+
+class SqliteResponseCache(ThreadLocalSqlite):
+    """Thread-safe key/value cache for LLM responses with per-entry expiry."""
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> None:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key         TEXT PRIMARY KEY,
+                value       TEXT NOT NULL,
+                expires_at  REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_response_cache_expires
+            ON response_cache (expires_at)
+        """)
+        conn.commit()
+
+    @staticmethod
+    def make_key(namespace: str, **parts: object) -> str:
+        """Stable sha256 key over a namespace and JSON-serializable parts."""
+        payload = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(namespace.encode() + b"\0" + payload).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float) -> Future:
+        """Queue the entry on the shared writer; doesn't block."""
+        now = time.time()
+
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            conn.execute(
+                """INSERT INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET
+                       value = excluded.value,
+                       expires_at = excluded.expires_at""",
+                (key, value, now + ttl),
+            )
+
+        return self._write(op)
+
+
+@functools.cache
+def get_response_cache() -> SqliteResponseCache:
+    """Process-wide response cache, opened on first use."""
+    return SqliteResponseCache(db_path(), get_job_store().write)
@@ -2,14 +2,253 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import atexit
+import logging
+import queue
 import sqlite3
 import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
 from datetime import datetime, timezone
+from operator import attrgetter
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+import orjson
 
 from bot.pipeline.models import PipelineResult, PipelineStage
+from bot.pipeline.utils import output_relative
+from bot.storage import WriteOp
+
+logger = logging.getLogger(__name__)
+
+# Most writes the writer thread commits in one transaction
+_WRITE_BATCH = 256
+
+# ── Write queries ──────────────────────────────────────────────────
+
+# Upsert rather than INSERT OR REPLACE: REPLACE's implicit delete doesn't
+# fire jobs_ad, which would desync jobs_fts
+_SQL_INSERT_JOB = """INSERT INTO jobs
+                   (job_id, data, stage, created_at, completed_at, prompt,
+                    image_count, winner, winner_path)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(job_id) DO UPDATE SET
+                       data = excluded.data,
+                       stage = excluded.stage,
+                       created_at = excluded.created_at,
+                       completed_at = excluded.completed_at,
+                       prompt = excluded.prompt,
+                       image_count = excluded.image_count,
+                       winner = excluded.winner,
+                       winner_path = excluded.winner_path,
+                       version = version + 1"""
+_SQL_UPSERT_PROMPT = """INSERT INTO prompt_variants (job_id, variant, narrative_prompt)
+               VALUES (?, ?, ?)
+               ON CONFLICT(job_id, variant) DO UPDATE SET
+                   narrative_prompt = excluded.narrative_prompt"""
+_SQL_UPDATE_STAGE = "UPDATE jobs SET stage = ? WHERE job_id = ?"
+# Only the row currently selected needs clearing
+_SQL_DESELECT = (
+    "UPDATE image_feedback SET selected = 0"
+    " WHERE job_id = ? AND selected = 1 AND variant != ?"
+)
+_SQL_UPSERT_FEEDBACK = """INSERT INTO image_feedback (job_id, variant, rating, selected, created_at)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(job_id, variant) DO UPDATE SET
+                   rating = excluded.rating,
+                   selected = excluded.selected,
+                   created_at = excluded.created_at"""
+_SQL_UPDATE_JOB = """UPDATE jobs SET
+                    data = ?, stage = ?, completed_at = ?, prompt = ?,
+                    image_count = ?, winner = ?, winner_path = ?,
+                    version = version + 1
+                   WHERE job_id = ?"""
+_SQL_SET_SUMMARY = (
+    "UPDATE jobs SET image_count = ?, winner = ?, winner_path = ? WHERE job_id = ?"
+)
+
+# ── Read queries ───────────────────────────────────────────────────
+# Module constants: every call passes the identical string, so each
+# connection's prepared-statement cache always hits.
+
+_JOB_COLUMNS = "job_id, version, data, stage"
+
+_SQL_GET_JOB = f"SELECT {_JOB_COLUMNS} FROM jobs WHERE job_id = ?"
+# Inlined rather than bound: SQLite only uses a partial index when the query's
+# WHERE clause textually implies the index's
+_WHERE_ACTIVE = (
+    f"stage NOT IN ('{PipelineStage.COMPLETE.value}', '{PipelineStage.FAILED.value}')"
+)
+_SQL_ACTIVE_SUMMARY = (
+    "SELECT job_id, stage, created_at, prompt FROM jobs"
+    f" WHERE {_WHERE_ACTIVE} ORDER BY created_at DESC"
+)
+# List views read these precomputed columns instead of parsing the blob
+_SUMMARY_COLUMNS = (
+    "job_id, prompt, stage, created_at, completed_at, image_count, winner, winner_path"
+)
+_SQL_SUMMARY_NEWEST = (
+    f"SELECT {_SUMMARY_COLUMNS} FROM jobs ORDER BY created_at DESC LIMIT ? OFFSET ?"
+)
+_SQL_SUMMARY_OLDEST = (
+    f"SELECT {_SUMMARY_COLUMNS} FROM jobs ORDER BY created_at ASC LIMIT ? OFFSET ?"
+)
+_SQL_SEARCH_SUMMARY = f"""SELECT {", ".join("j." + c for c in _SUMMARY_COLUMNS.split(", "))}
+               FROM jobs_fts f
+               JOIN jobs j ON j.rowid = f.rowid
+               WHERE jobs_fts MATCH ?
+               ORDER BY j.created_at {{order}}
+               LIMIT ? OFFSET ?"""
+_SQL_SEARCH_SUMMARY_NEWEST = _SQL_SEARCH_SUMMARY.format(order="DESC")
+_SQL_SEARCH_SUMMARY_OLDEST = _SQL_SEARCH_SUMMARY.format(order="ASC")
+_SQL_GET_FEEDBACK = "SELECT variant, rating, selected FROM image_feedback WHERE job_id = ?"
+# IDs arrive as one JSON array, so the statement text is fixed whatever the count
+_SQL_GET_FEEDBACK_BULK = """SELECT job_id, variant, rating, selected FROM image_feedback
+               WHERE job_id IN (SELECT value FROM json_each(?))"""
+_SQL_TOP_PROMPTS = """SELECT f.job_id, f.variant, f.rating, f.selected,
+                      pv.narrative_prompt, j.prompt AS user_prompt
+               FROM image_feedback f
+               JOIN jobs j ON j.job_id = f.job_id
+               LEFT JOIN prompt_variants pv
+                   ON pv.job_id = f.job_id AND pv.variant = f.variant
+               WHERE f.rating > 0 OR f.selected = 1
+               ORDER BY f.selected DESC, f.rating DESC
+               LIMIT ?"""
+
+# Per-connection prepared-statement cache (sqlite3 default: 128)
+_CACHED_STATEMENTS = 256
+
+# ── Blob compression ──────────────────────────────────────────────
+# ``data`` is raw JSON (legacy rows, first byte ``{``) or a one-byte codec
+# tag followed by a deflate stream primed with a preset dictionary of the
+# keys and values every PipelineResult repeats. A stored blob can only be
+# inflated with the exact dictionary it was written with: never edit
+# _ZDICT_V1 — add a new tag and dictionary instead.
+_CODEC_ZLIB_V1 = b"\x01"
+_ZDICT_V1 = (
+    b'"variant_type":"v6-reference-copy","variant_type":"v5-bold-creative",'
+    b'"variant_type":"v4-style-variation","variant_type":"v3-alt-composition",'
+    b'"variant_type":"v2-enhanced","variant_type":"v1-faithful",'
+    b'"refinements":[{"variant":"","instruction":"","original_path":"","refined_path":"",'
+    b'"evaluation":{"evaluations":[{"scores":{"faithfulness":,"conciseness":,'
+    b'"readability":,"aesthetics":},"review":"","rank":}],"summary":"","winner":"'
+    b'"images":[{"file_path":"/outputs/","gemini_text":"","success":true,"success":false,"error":"'
+    b'"prompts":[{"label":"","narrative_prompt":"Create a professional social media ad static '
+    b'for ApotekHunden, forest green #2C5530, cream #FAF7F2, amber #C8924A. All text in Swedish.",'
+    b'"rationale":""},'
+    b'"research":{"style_analysis":"","color_palette":["#"],"composition_notes":"","mood":"",'
+    b'"key_elements":[""],"raw_analysis":"**Style Analysis:** **Color Palette:** '
+    b'**Composition Notes:** **Mood:** **Key Elements:** "},'
+    b'"stage":"complete","stage":"failed","started_at":"T:.Z","completed_at":"T:.Z",'
+    b'{"job_id":"","request":{"job_id":"","user_prompt":"","reference_image_paths":["/uploads/"],'
+    b'"aspect_ratio":"4:3","resolution":"2K","telegram_chat_id":,"telegram_message_id":,'
+    b'"created_at":"T:.Z"},'
+)
+_ZLIB_LEVEL = 6
+
+
+def _compress(raw: bytes) -> bytes:
+    c = zlib.compressobj(_ZLIB_LEVEL, zdict=_ZDICT_V1)
+    return _CODEC_ZLIB_V1 + c.compress(raw) + c.flush()
+
+
+def _decompress(data: bytes | str) -> bytes | str:
+    """JSON for a stored blob; legacy uncompressed rows pass through."""
+    if isinstance(data, bytes) and data[:1] == _CODEC_ZLIB_V1:
+        return zlib.decompressobj(zdict=_ZDICT_V1).decompress(data[1:])
+    return data
+
+
+class _JsonCache:
+    """Thread-safe LRU of decompressed result JSON keyed by (job_id, version).
+
+    Only the immutable bytes are shared; every read validates its own
+    PipelineResult, so callers may mutate what they get back.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._data: OrderedDict[tuple[str, int], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str, version: int, data: bytes | str) -> bytes | str:
+        key = (job_id, version)
+        with self._lock:
+            raw = self._data.get(key)
+            if raw is not None:
+                self._data.move_to_end(key)
+                return raw
+        raw = _decompress(data)
+        with self._lock:
+            self._data[key] = raw
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+        return raw
+
+
+_json_cache = _JsonCache(maxsize=256)
+
+
+class JobSummary(NamedTuple):
+    """List-view columns of a job, read without touching the result blob."""
+
+    job_id: str
+    prompt: str
+    stage: PipelineStage
+    created_at: str
+    completed_at: Optional[str]
+    image_count: int
+    winner: Optional[str]
+    winner_path: Optional[str]
+
+
+_SUCCESS = attrgetter("success")
+
+
+def _summary_values(result: PipelineResult) -> tuple[int, Optional[str], Optional[str]]:
+    """(image_count, winner, winner_path) derived once per write."""
+    image_count = sum(map(_SUCCESS, result.images))
+    winner = result.evaluation.winner if result.evaluation else None
+    winner_path = None
+    if winner is not None:
+        winner_path = next(
+            (
+                output_relative(img.file_path)
+                for img in result.images
+                if img.variant_type == winner and img.success and img.file_path
+            ),
+            None,
+        )
+    return image_count, winner.value if winner else None, winner_path
+
+
+class StatusRow(NamedTuple):
+    """Lightweight job status straight from the denormalized columns."""
+    job_id: str
+    stage: PipelineStage
+    created_at: str
+    prompt: str
+
+
+def _fts_match(query: str) -> str:
+    """FTS5 MATCH expression with each word as a quoted prefix term.
+
+    Quoting makes FTS5 operators and punctuation in user input match literally.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in query.split())
+
+
+def _noop(conn: sqlite3.Connection) -> None:
+    pass
+
+
+def _log_write_error(fut: Future) -> None:
+    exc = fut.exception()
+    if exc is not None:
+        logger.error("Job store write failed", exc_info=exc)
 
 
 class SqliteJobStore:
@@ -17,23 +256,67 @@ class SqliteJobStore:
 
     Stores the full PipelineResult as JSON with denormalized columns
     for fast queries (stage, created_at, prompt).
+
+    All writes run on one background writer thread that owns the only
+    read-write connection: write methods enqueue the write and return a
+    ``Future`` that resolves once it is committed (or carries its error), and
+    the writer commits whatever has queued up as a single transaction.
+    ``flush()`` / ``flush_async()`` wait until everything queued so far is
+    committed. Reads use a read-only connection per calling thread.
+    ``write()`` is public so the other stores sharing the file (response
+    cache, user prefs) queue their writes here too.
     """
 
     def __init__(self, db_path: Path) -> None:
         self._db_path = db_path
         db_path.parent.mkdir(parents=True, exist_ok=True)
         self._local = threading.local()
-        self._init_schema(self._conn)
+        self._ro_uri = db_path.resolve().as_uri() + "?mode=ro"
+        self._data_version = 0
+
+        writer = self._connect(str(db_path))
+        writer.execute("PRAGMA journal_mode=WAL")
+        writer.execute("PRAGMA synchronous=NORMAL")
+        writer.execute("PRAGMA wal_autocheckpoint=1000")
+        self._init_schema(writer)
+        self._migrate_legacy_rows(writer)
+        self._backfill_summaries(writer)
+        writer.isolation_level = None  # the writer thread issues BEGIN/COMMIT itself
+
+        self._queue: queue.SimpleQueue[tuple[WriteOp | None, Future]] = queue.SimpleQueue()
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, args=(writer,), name="job-store-writer", daemon=True,
+        )
+        self._writer_thread.start()
+        atexit.register(self.close)
+
+    @property
+    def data_version(self) -> int:
+        """Bumped after every committed write batch; a cheap cache key for readers."""
+        return self._data_version
+
+    @staticmethod
+    def _connect(database: str, uri: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            database,
+            uri=uri,
+            check_same_thread=False,
+            cached_statements=_CACHED_STATEMENTS,
+        )
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA cache_spill=OFF")
+        conn.row_factory = sqlite3.Row
+        return conn
 
     @property
     def _conn(self) -> sqlite3.Connection:
-        """One connection per thread (SQLite requirement)."""
+        """One read-only connection per thread (SQLite requirement)."""
         conn = getattr(self._local, "conn", None)
         if conn is None:
-            conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.row_factory = sqlite3.Row
+            conn = self._connect(self._ro_uri, uri=True)
             self._local.conn = conn
         return conn
 
@@ -42,13 +325,23 @@ class SqliteJobStore:
         conn.execute("""
             CREATE TABLE IF NOT EXISTS jobs (
                 job_id      TEXT PRIMARY KEY,
-                data        TEXT NOT NULL,
+                data        BLOB NOT NULL,
                 stage       TEXT NOT NULL,
                 created_at  TEXT NOT NULL,
                 completed_at TEXT,
-                prompt      TEXT NOT NULL DEFAULT ''
+                prompt      TEXT NOT NULL DEFAULT '',
+                version     INTEGER NOT NULL DEFAULT 1
             )
         """)
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}
+        if "version" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        # NULL image_count marks a row whose summary columns need backfilling
+        for column, decl in (
+            ("image_count", "INTEGER"), ("winner", "TEXT"), ("winner_path", "TEXT"),
+        ):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {decl}")
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_jobs_created
             ON jobs (created_at DESC)
@@ -57,6 +350,49 @@ class SqliteJobStore:
             CREATE INDEX IF NOT EXISTS idx_jobs_stage
             ON jobs (stage)
         """)
+        # Partial + covering: terminal rows (the bulk of the table) take no
+        # space, and list_active_summary is answered from the index alone
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_jobs_active
+            ON jobs (created_at DESC, job_id, stage, prompt)
+            WHERE {_WHERE_ACTIVE}
+        """)
+        has_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+        ).fetchone()
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                job_id UNINDEXED,
+                prompt,
+                content='jobs',
+                content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+                INSERT INTO jobs_fts (rowid, job_id, prompt)
+                VALUES (new.rowid, new.job_id, new.prompt);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+                INSERT INTO jobs_fts (jobs_fts, rowid, job_id, prompt)
+                VALUES ('delete', old.rowid, old.job_id, old.prompt);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF prompt ON jobs
+            WHEN old.prompt IS NOT new.prompt BEGIN
+                INSERT INTO jobs_fts (jobs_fts, rowid, job_id, prompt)
+                VALUES ('delete', old.rowid, old.job_id, old.prompt);
+                INSERT INTO jobs_fts (rowid, job_id, prompt)
+                VALUES (new.rowid, new.job_id, new.prompt);
+            END
+        """)
+        if not has_fts:
+            # Index jobs written before the FTS table existed
+            conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS image_feedback (
                 id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -68,78 +404,259 @@ class SqliteJobStore:
                 UNIQUE(job_id, variant)
             )
         """)
+        has_variants = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'prompt_variants'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS prompt_variants (
+                job_id           TEXT NOT NULL,
+                variant          TEXT NOT NULL,
+                narrative_prompt TEXT NOT NULL,
+                PRIMARY KEY (job_id, variant)
+            )
+        """)
+        if not has_variants:
+            # Backfill from jobs written before the side table existed
+            conn.execute("""
+                INSERT OR IGNORE INTO prompt_variants (job_id, variant, narrative_prompt)
+                SELECT j.job_id,
+                       json_extract(p.value, '$.variant_type'),
+                       json_extract(p.value, '$.narrative_prompt')
+                FROM jobs j, json_each(CAST(j.data AS TEXT), '$.prompts') p
+                WHERE json_valid(CAST(j.data AS TEXT))
+            """)
+        conn.commit()
+
+    @classmethod
+    def _backfill_summaries(cls, conn: sqlite3.Connection) -> None:
+        """Fill the list-view columns for rows written before they existed."""
+        rows = conn.execute("SELECT job_id, data FROM jobs WHERE image_count IS NULL").fetchall()
+        if not rows:
+            return
+        conn.executemany(
+            _SQL_SET_SUMMARY,
+            [(*_summary_values(cls._deserialize(data)), job_id) for job_id, data in rows],
+        )
+        conn.commit()
+
+    @staticmethod
+    def _migrate_legacy_rows(conn: sqlite3.Connection) -> None:
+        """One-shot: re-encode rows stored as plain JSON (TEXT, or BLOB from before compression)."""
+        rows = conn.execute(
+            "SELECT job_id, data FROM jobs"
+            " WHERE typeof(data) = 'text' OR substr(data, 1, 1) = X'7B'"
+        ).fetchall()
+        if not rows:
+            return
+        conn.executemany(
+            "UPDATE jobs SET data = ? WHERE job_id = ?",
+            [
+                (_compress(d.encode() if isinstance(d, str) else d), job_id)
+                for job_id, d in rows
+            ],
+        )
         conn.commit()
 
+    # ── Writer thread ──────────────────────────────────────
+
+    def _writer_loop(self, conn: sqlite3.Connection) -> None:
+        """Drain the write queue, committing each batch as one transaction."""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            outcomes: list[tuple[Future, BaseException | None]] = []
+            stop = False
+            if all(op is _noop or op is None for op, _ in batch):
+                # Only flush markers / the stop sentinel: nothing to commit,
+                # and the data version must not move
+                for op, fut in batch:
+                    stop = stop or op is None
+                    fut.set_result(None)
+                if stop:
+                    conn.close()
+                    return
+                continue
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for op, fut in batch:
+                    if op is None:
+                        stop = True
+                        outcomes.append((fut, None))
+                        continue
+                    # A failing write is undone alone; the rest of the batch commits
+                    conn.execute("SAVEPOINT write_op")
+                    try:
+                        op(conn)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write_op")
+                        outcomes.append((fut, e))
+                    else:
+                        outcomes.append((fut, None))
+                    conn.execute("RELEASE write_op")
+                conn.execute("COMMIT")
+                self._data_version += 1
+            except Exception as e:
+                logger.exception("Job store write batch failed")
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                outcomes = [(fut, e) for _, fut in batch]
+
+            for fut, exc in outcomes:
+                if exc is None:
+                    fut.set_result(None)
+                else:
+                    fut.set_exception(exc)
+            if stop:
+                conn.close()
+                return
+
+    def _submit(self, op: WriteOp | None) -> Future:
+        fut: Future = Future()
+        self._queue.put((op, fut))
+        return fut
+
+    def write(self, op: WriteOp) -> Future:
+        """Queue a write; the returned Future resolves once it is committed."""
+        fut = self._submit(op)
+        fut.add_done_callback(_log_write_error)
+        return fut
+
+    def flush(self) -> None:
+        """Block until every write queued so far is committed."""
+        self._submit(_noop).result()
+
+    async def flush_async(self) -> None:
+        """``flush()`` without blocking the event loop."""
+        await asyncio.wrap_future(self._submit(_noop))
+
+    def close(self) -> None:
+        """Commit outstanding writes and stop the writer thread."""
+        if self._writer_thread.is_alive():
+            self._submit(None).result()
+            self._writer_thread.join()
+
     @staticmethod
-    def _serialize(result: PipelineResult) -> str:
-        return result.model_dump_json()
+    def _serialize(result: PipelineResult) -> bytes:
+        """UTF-8 JSON straight from pydantic-core, dictionary-compressed into a BLOB."""
+        return _compress(PipelineResult.__pydantic_serializer__.to_json(
+            result, exclude_none=True, exclude_defaults=True,
+        ))
 
     @staticmethod
-    def _deserialize(data: str) -> PipelineResult:
-        return PipelineResult.model_validate_json(data)
+    def _deserialize(data: bytes | str) -> PipelineResult:
+        # Rows written before the BLOB switch come back as str; both parse
+        return PipelineResult.model_validate_json(_decompress(data))
 
-    # ── CRUD ──────────────────────────────────────────────
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> PipelineResult:
+        """Fresh result per call; the ``stage`` column wins, since update_stage skips the blob."""
+        raw = _json_cache.get(row["job_id"], row["version"], row["data"])
+        result = PipelineResult.model_validate_json(raw)
+        result.stage = PipelineStage(row["stage"])
+        return result
 
-    def create(self, result: PipelineResult) -> None:
-        self._conn.execute(
-            """INSERT OR REPLACE INTO jobs
-               (job_id, data, stage, created_at, completed_at, prompt)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (
-                result.job_id,
-                self._serialize(result),
-                result.stage.value,
-                result.request.created_at.isoformat(),
-                result.completed_at.isoformat() if result.completed_at else None,
-                result.request.user_prompt,
-            ),
+    @staticmethod
+    def _prompt_rows(result: PipelineResult) -> list[tuple]:
+        """``prompt_variants`` rows mirroring each variant's narrative prompt."""
+        return [(result.job_id, p.variant_type.value, p.narrative_prompt) for p in result.prompts]
+
+    @classmethod
+    def _insert_params(cls, result: PipelineResult) -> tuple:
+        return (
+            result.job_id,
+            cls._serialize(result),
+            result.stage.value,
+            result.request.created_at.isoformat(),
+            result.completed_at.isoformat() if result.completed_at else None,
+            result.request.user_prompt,
+            *_summary_values(result),
         )
-        self._conn.commit()
+
+    # Write methods serialize on the calling thread, so the queued write is a
+    # snapshot even if the caller keeps mutating the result.
+
+    def create(self, result: PipelineResult) -> Future:
+        params = self._insert_params(result)
+        prompts = self._prompt_rows(result)
+
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute(_SQL_INSERT_JOB, params)
+            if prompts:
+                conn.executemany(_SQL_UPSERT_PROMPT, prompts)
+
+        return self.write(op)
 
     def get(self, job_id: str) -> Optional[PipelineResult]:
-        row = self._conn.execute(
-            "SELECT data FROM jobs WHERE job_id = ?", (job_id,)
-        ).fetchone()
+        row = self._conn.execute(_SQL_GET_JOB, (job_id,)).fetchone()
         if row is None:
             return None
-        return self._deserialize(row["data"])
+        return self._from_row(row)
 
-    def update_result(self, result: PipelineResult) -> None:
-        """Persist the full current state of a PipelineResult."""
-        self._conn.execute(
-            """UPDATE jobs SET
-                data = ?, stage = ?, completed_at = ?, prompt = ?
-               WHERE job_id = ?""",
-            (
-                self._serialize(result),
-                result.stage.value,
-                result.completed_at.isoformat() if result.completed_at else None,
-                result.request.user_prompt,
-                result.job_id,
-            ),
+    @classmethod
+    def _update_params(cls, result: PipelineResult) -> tuple:
+        return (
+            cls._serialize(result),
+            result.stage.value,
+            result.completed_at.isoformat() if result.completed_at else None,
+            result.request.user_prompt,
+            *_summary_values(result),
+            result.job_id,
         )
-        self._conn.commit()
 
-    def list_all(self) -> list[PipelineResult]:
-        rows = self._conn.execute(
-            "SELECT data FROM jobs ORDER BY created_at DESC"
-        ).fetchall()
-        return [self._deserialize(r["data"]) for r in rows]
+    def update_result(self, result: PipelineResult) -> Future:
+        """Persist the full current state of a PipelineResult."""
+        params = self._update_params(result)
+        prompts = self._prompt_rows(result)
 
-    def list_active(self) -> list[PipelineResult]:
-        rows = self._conn.execute(
-            "SELECT data FROM jobs WHERE stage NOT IN (?, ?)",
-            (PipelineStage.COMPLETE.value, PipelineStage.FAILED.value),
-        ).fetchall()
-        return [self._deserialize(r["data"]) for r in rows]
+        def op(conn: sqlite3.Connection) -> None:
+            conn.execute(_SQL_UPDATE_JOB, params)
+            if prompts:
+                conn.executemany(_SQL_UPSERT_PROMPT, prompts)
 
-    def search(self, query: str) -> list[PipelineResult]:
-        """Full-text search on prompt column."""
-        rows = self._conn.execute(
-            "SELECT data FROM jobs WHERE prompt LIKE ? ORDER BY created_at DESC",
-            (f"%{query}%",),
-        ).fetchall()
-        return [self._deserialize(r["data"]) for r in rows]
+        return self.write(op)
+
+    def update_stage(self, job_id: str, stage: str) -> Future:
+        """Advance only the stage column — no re-serialization of the result."""
+        return self.write(lambda conn: conn.execute(_SQL_UPDATE_STAGE, (stage, job_id)))
+
+    def iter_summaries(
+        self, *, limit: Optional[int] = None, offset: int = 0, oldest_first: bool = False,
+    ) -> Iterator[JobSummary]:
+        """List-view columns, newest first unless ``oldest_first`` — no JSON parsing."""
+        sql = _SQL_SUMMARY_OLDEST if oldest_first else _SQL_SUMMARY_NEWEST
+        for row in self._conn.execute(sql, (-1 if limit is None else limit, offset)):
+            yield self._summary_from_row(row)
+
+    def search_summaries(
+        self, query: str, *, limit: Optional[int] = None, offset: int = 0, oldest_first: bool = False,
+    ) -> Iterator[JobSummary]:
+        """List-view columns of jobs whose prompt matches ``query``, paged by date in SQL."""
+        match = _fts_match(query)
+        if not match:
+            return
+        sql = _SQL_SEARCH_SUMMARY_OLDEST if oldest_first else _SQL_SEARCH_SUMMARY_NEWEST
+        for row in self._conn.execute(sql, (match, -1 if limit is None else limit, offset)):
+            yield self._summary_from_row(row)
+
+    @staticmethod
+    def _summary_from_row(row: sqlite3.Row) -> JobSummary:
+        return JobSummary(
+            row["job_id"], row["prompt"], PipelineStage(row["stage"]), row["created_at"],
+            row["completed_at"], row["image_count"] or 0, row["winner"], row["winner_path"],
+        )
+
+    def list_active_summary(self) -> list[StatusRow]:
+        """Active jobs' status columns only — no JSON parsing."""
+        rows = self._conn.execute(_SQL_ACTIVE_SUMMARY).fetchall()
+        return [
+            StatusRow(r["job_id"], PipelineStage(r["stage"]), r["created_at"], r["prompt"])
+            for r in rows
+        ]
 
     # ── Feedback ───────────────────────────────────────────
 
@@ -149,68 +666,48 @@ class SqliteJobStore:
         variant: str,
         rating: int = 0,
         selected: bool = False,
-    ) -> None:
+    ) -> Future:
         """UPSERT feedback for a variant. If selected=True, deselect others in same job."""
-        conn = self._conn
-        if selected:
+        now = datetime.now(timezone.utc).isoformat()
+
+        def op(conn: sqlite3.Connection) -> None:
+            if selected:
+                conn.execute(_SQL_DESELECT, (job_id, variant))
             conn.execute(
-                "UPDATE image_feedback SET selected = 0 WHERE job_id = ?",
-                (job_id,),
+                _SQL_UPSERT_FEEDBACK,
+                (job_id, variant, rating, 1 if selected else 0, now),
             )
-        now = datetime.now(timezone.utc).isoformat()
-        conn.execute(
-            """INSERT INTO image_feedback (job_id, variant, rating, selected, created_at)
-               VALUES (?, ?, ?, ?, ?)
-               ON CONFLICT(job_id, variant) DO UPDATE SET
-                   rating = excluded.rating,
-                   selected = excluded.selected,
-                   created_at = excluded.created_at""",
-            (job_id, variant, rating, 1 if selected else 0, now),
-        )
-        conn.commit()
+
+        return self.write(op)
 
     def get_feedback(self, job_id: str) -> list[dict]:
         """Return all feedback rows for a job."""
-        rows = self._conn.execute(
-            "SELECT variant, rating, selected FROM image_feedback WHERE job_id = ?",
-            (job_id,),
-        ).fetchall()
+        rows = self._conn.execute(_SQL_GET_FEEDBACK, (job_id,)).fetchall()
         return [
             {"variant": r["variant"], "rating": r["rating"], "selected": bool(r["selected"])}
             for r in rows
         ]
 
+    def get_feedback_bulk(self, job_ids: Iterable[str]) -> dict[str, list[dict]]:
+        """Feedback rows for several jobs in one query, keyed by job_id."""
+        out: dict[str, list[dict]] = defaultdict(list)
+        for r in self._conn.execute(_SQL_GET_FEEDBACK_BULK, (orjson.dumps(list(job_ids)),)):
+            out[r["job_id"]].append(
+                {"variant": r["variant"], "rating": r["rating"], "selected": bool(r["selected"])}
+            )
+        return out
+
     def get_top_performing_prompts(self, limit: int = 10) -> list[dict]:
         """Get prompts from jobs with positive feedback or selected variants."""
-        rows = self._conn.execute(
-            """SELECT f.job_id, f.variant, f.rating, f.selected,
-                      j.data, j.prompt AS user_prompt
-               FROM image_feedback f
-               JOIN jobs j ON j.job_id = f.job_id
-               WHERE f.rating > 0 OR f.selected = 1
-               ORDER BY f.selected DESC, f.rating DESC
-               LIMIT ?""",
-            (limit,),
-        ).fetchall()
-
-        results = []
-        for r in rows:
-            prompt_text = ""
-            try:
-                data = json.loads(r["data"])
-                for p in data.get("prompts", []):
-                    if p.get("variant_type") == r["variant"]:
-                        prompt_text = p.get("narrative_prompt", "")
-                        break
-            except (json.JSONDecodeError, KeyError):
-                pass
-
-            results.append({
+        rows = self._conn.execute(_SQL_TOP_PROMPTS, (limit,)).fetchall()
+        return [
+            {
                 "job_id": r["job_id"],
                 "variant": r["variant"],
-                "prompt_text": prompt_text,
+                "prompt_text": r["narrative_prompt"] or "",
                 "user_prompt": r["user_prompt"],
                 "rating": r["rating"],
                 "selected": bool(r["selected"]),
-            })
-        return results
+            }
+            for r in rows
+        ]
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
-from bot.config import DATA_DIR
+import functools
+
+from bot.storage import db_path
 from bot.storage.database import SqliteJobStore
 
-# Singleton — drop-in replacement for the old in-memory JobStore
-job_store = SqliteJobStore(DATA_DIR / "banana_squad.db")
+
+@functools.cache
+def get_job_store() -> SqliteJobStore:
+    """Process-wide job store, opened on first use rather than at import."""
+    return SqliteJobStore(db_path())
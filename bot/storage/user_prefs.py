@@ -0,0 +1,70 @@
+"""Per-user Telegram settings — SQLite-backed with an in-process read cache."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import sqlite3
+from concurrent.futures import Future
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+from bot.storage import ThreadLocalSqlite, WriteOp, db_path
+from bot.storage.jobs import get_job_store
+
+DEFAULT_PREFS: Mapping[str, str] = MappingProxyType({"aspect_ratio": "4:3", "resolution": "2K"})
+
+# Column names are interpolated into SQL, so only these are accepted
+_UPSERT_SQL = {
+    key: f"""INSERT INTO user_prefs (user_id, {key}) VALUES (?, ?)
+             ON CONFLICT(user_id) DO UPDATE SET {key} = excluded.{key}"""
+    for key in DEFAULT_PREFS
+}
+
+
+class SqliteUserPrefs(ThreadLocalSqlite):
+    """Thread-safe user prefs store; reads are served from an LRU cache."""
+
+    def __init__(self, db_path: Path, write: Callable[[WriteOp], Future]) -> None:
+        super().__init__(db_path, write)
+        self.get = lru_cache(maxsize=1024)(self._load)
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> None:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS user_prefs (
+                user_id       INTEGER PRIMARY KEY,
+                aspect_ratio  TEXT NOT NULL DEFAULT '{DEFAULT_PREFS["aspect_ratio"]}',
+                resolution    TEXT NOT NULL DEFAULT '{DEFAULT_PREFS["resolution"]}'
+            )
+        """)
+        conn.commit()
+
+    def _load(self, user_id: int) -> Mapping[str, str]:
+        """Immutable settings for ``user_id``; defaults if never stored."""
+        row = self._conn.execute(
+            "SELECT aspect_ratio, resolution FROM user_prefs WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        if row is None:
+            return DEFAULT_PREFS
+        return MappingProxyType({"aspect_ratio": row[0], "resolution": row[1]})
+
+    async def set(self, user_id: int, key: str, value: str) -> Mapping[str, str]:
+        """Write one setting through and return the refreshed settings."""
+        sql = _UPSERT_SQL.get(key)
+        if sql is None:
+            raise KeyError(f"Unknown user setting: {key!r}")
+        # Committed on the shared writer thread, not the event loop
+        await asyncio.wrap_future(self._write(lambda conn: conn.execute(sql, (user_id, value))))
+        # lru_cache has no per-key eviction; prefs change rarely
+        self.get.cache_clear()
+        return self.get(user_id)
+
+
+@functools.cache
+def get_user_prefs() -> SqliteUserPrefs:
+    """Process-wide user prefs store, opened on first use."""
+    return SqliteUserPrefs(db_path(), get_job_store().write)
@@ -12,7 +12,7 @@ from telegram.ext import (
     filters,
 )
 
-from bot.config import TELEGRAM_BOT_TOKEN
+from bot.config import get_settings
 from bot.telegram_bot.handlers import (
     callback_handler,
     cancel_handler,
@@ -30,12 +30,13 @@ logger = logging.getLogger(__name__)
 def build_application() -> Application:
     """Build and configure the Telegram bot application."""
 
-    if not TELEGRAM_BOT_TOKEN:
+    token = get_settings().telegram_bot_token
+    if not token:
         raise RuntimeError("TELEGRAM_BOT_TOKEN not set in environment")
 
     app = (
         Application.builder()
-        .token(TELEGRAM_BOT_TOKEN)
+        .token(token)
         .build()
     )
 
@@ -6,49 +6,86 @@ import asyncio
 import logging
 from pathlib import Path
 
-from telegram import InputMediaPhoto, Update
+from telegram import CallbackQuery, InputMediaPhoto, Update
 from telegram.ext import ContextTypes
 
-from bot.config import ALLOWED_USER_IDS, DEFAULT_PRODUCT_IMAGE, OUTPUTS_DIR
+from bot.config import get_settings
 from bot.pipeline.events import event_bus
 from bot.pipeline.models import PipelineRequest
 from bot.pipeline.orchestrator import run_pipeline
 from bot.telegram_bot.keyboards import (
+    CB,
     cancel_keyboard,
     refinement_keyboard,
     settings_keyboard,
 )
+from bot.storage.jobs import get_job_store
+from bot.storage.user_prefs import get_user_prefs
 from bot.telegram_bot.progress import ProgressTracker
 
 logger = logging.getLogger(__name__)
 
-# Per-user settings stored in memory
-_user_settings: dict[int, dict] = {}
 # Active jobs per user
 _active_jobs: dict[int, str] = {}
 
 
-def _get_settings(user_id: int) -> dict:
-    if user_id not in _user_settings:
-        _user_settings[user_id] = {"aspect_ratio": "4:3", "resolution": "2K"}
-    return _user_settings[user_id]
-
-
 def _default_refs() -> list[str]:
     """Return the default product image path if configured."""
-    if DEFAULT_PRODUCT_IMAGE and DEFAULT_PRODUCT_IMAGE.exists():
-        return [str(DEFAULT_PRODUCT_IMAGE)]
+    product_image = get_settings().default_product_image
+    if product_image and product_image.exists():
+        return [str(product_image)]
     return []
 
 
+def _read_bytes(path: Path) -> bytes | None:
+    """File contents, or None if it has gone missing. Runs in a worker thread."""
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
 def _is_allowed(user_id: int) -> bool:
-    if not ALLOWED_USER_IDS:
+    allowed = get_settings().allowed_user_ids
+    if not allowed:
         return True  # No allowlist = open access
-    return user_id in ALLOWED_USER_IDS
+    return user_id in allowed
 
 
 # ── Commands ───────────────────────────────────────────────────────
 
+_START_TEMPLATE = (
+    "🐾 *Välkommen till Banana Squad, {name}!*\n\n"
+    "Skicka mig en textbeskrivning av bilden du vill skapa, "
+    "så genererar jag 5 professionella varianter åt dig.\n\n"
+    "📸 Du kan även skicka en referensbild med bildtext.\n\n"
+    "*Kommandon:*\n"
+    "/settings — Ändra bildformat & upplösning\n"
+    "/help — Visa hjälp\n"
+    "/status — Se aktiva jobb\n"
+    "/cancel — Avbryt pågående generation"
+)
+
+_HELP_TEXT = (
+    "🐾 *Banana Squad — Hjälp*\n\n"
+    "*Så här fungerar det:*\n"
+    "1. Skriv vad du vill ha för bild\n"
+    "2. Fyra AI-agenter samarbetar:\n"
+    "   🔍 Forskning → ✏️ Promptdesign → 🎨 Bildgenerering → ⭐ Utvärdering\n"
+    "3. Du får 5 varianter rankade efter kvalitet\n\n"
+    "*Tips:*\n"
+    "• Beskriv bilden detaljerat — stämning, vinkel, ljussättning\n"
+    "• Skicka referensbilder för bättre resultat\n"
+    "• Använd /settings för att ändra format\n\n"
+    "*Varianter:*\n"
+    "v1: Trogen — närmast din beskrivning\n"
+    "v2: Förbättrad — högre produktionskvalitet\n"
+    "v3: Alt komposition — annan vinkel/layout\n"
+    "v4: Stilvariation — annat konstnärligt uttryck\n"
+    "v5: Kreativ — experimentell tolkning"
+)
+
+
 async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
     if not _is_allowed(user.id):
@@ -60,15 +97,7 @@ async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         return
 
     await update.message.reply_text(
-        f"🐾 *Välkommen till Banana Squad, {user.first_name}!*\n\n"
-        "Skicka mig en textbeskrivning av bilden du vill skapa, "
-        "så genererar jag 5 professionella varianter åt dig.\n\n"
-        "📸 Du kan även skicka en referensbild med bildtext.\n\n"
-        "*Kommandon:*\n"
-        "/settings — Ändra bildformat & upplösning\n"
-        "/help — Visa hjälp\n"
-        "/status — Se aktiva jobb\n"
-        "/cancel — Avbryt pågående generation",
+        _START_TEMPLATE.format(name=user.first_name),
         parse_mode="Markdown",
     )
 
@@ -77,32 +106,14 @@ async def help_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     if not _is_allowed(update.effective_user.id):
         return
 
-    await update.message.reply_text(
-        "🐾 *Banana Squad — Hjälp*\n\n"
-        "*Så här fungerar det:*\n"
-        "1. Skriv vad du vill ha för bild\n"
-        "2. Fyra AI-agenter samarbetar:\n"
-        "   🔍 Forskning → ✏️ Promptdesign → 🎨 Bildgenerering → ⭐ Utvärdering\n"
-        "3. Du får 5 varianter rankade efter kvalitet\n\n"
-        "*Tips:*\n"
-        "• Beskriv bilden detaljerat — stämning, vinkel, ljussättning\n"
-        "• Skicka referensbilder för bättre resultat\n"
-        "• Använd /settings för att ändra format\n\n"
-        "*Varianter:*\n"
-        "v1: Trogen — närmast din beskrivning\n"
-        "v2: Förbättrad — högre produktionskvalitet\n"
-        "v3: Alt komposition — annan vinkel/layout\n"
-        "v4: Stilvariation — annat konstnärligt uttryck\n"
-        "v5: Kreativ — experimentell tolkning",
-        parse_mode="Markdown",
-    )
+    await update.message.reply_text(_HELP_TEXT, parse_mode="Markdown")
 
 
 async def settings_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not _is_allowed(update.effective_user.id):
         return
 
-    settings = _get_settings(update.effective_user.id)
+    settings = get_user_prefs().get(update.effective_user.id)
     await update.message.reply_text(
         "⚙️ *Inställningar*\n\nVälj bildformat och upplösning:",
         parse_mode="Markdown",
@@ -119,7 +130,12 @@ async def status_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     user_id = update.effective_user.id
     job_id = _active_jobs.get(user_id)
     if job_id:
-        await update.message.reply_text(f"🔄 Aktivt jobb: `{job_id}`", parse_mode="Markdown")
+        active = await asyncio.to_thread(get_job_store().list_active_summary)
+        stage = next((row.stage.value for row in active if row.job_id == job_id), None)
+        text = f"🔄 Aktivt jobb: `{job_id}`"
+        if stage:
+            text += f" — {stage}"
+        await update.message.reply_text(text, parse_mode="Markdown")
     else:
         await update.message.reply_text("Inga aktiva jobb.")
 
@@ -150,7 +166,7 @@ async def text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         )
         return
 
-    settings = _get_settings(user.id)
+    settings = get_user_prefs().get(user.id)
     request = PipelineRequest(
         user_prompt=update.message.text,
         reference_image_paths=_default_refs(),
@@ -183,13 +199,13 @@ async def photo_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     photo = update.message.photo[-1]  # Largest resolution
 
     file = await photo.get_file()
-    ref_path = OUTPUTS_DIR / f"ref_{user.id}_{photo.file_id[-8:]}.jpg"
+    ref_path = get_settings().outputs_dir / f"ref_{user.id}_{photo.file_id[-8:]}.jpg"
     await file.download_to_drive(str(ref_path))
 
     # Combine user-uploaded reference with default product image
     ref_paths = [str(ref_path)] + _default_refs()
 
-    settings = _get_settings(user.id)
+    settings = get_user_prefs().get(user.id)
     request = PipelineRequest(
         user_prompt=caption,
         reference_image_paths=ref_paths,
@@ -206,54 +222,88 @@ async def photo_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
 # ── Callback queries (settings, refinement) ────────────────────────
 
-async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle inline keyboard button presses."""
-    query = update.callback_query
-    await query.answer()
+async def _on_ratio(query: CallbackQuery, user_id: int, arg: str) -> None:
+    settings = await get_user_prefs().set(user_id, "aspect_ratio", arg)
+    await query.edit_message_reply_markup(
+        reply_markup=settings_keyboard(settings["aspect_ratio"], settings["resolution"])
+    )
 
-    data = query.data
-    user_id = update.effective_user.id
 
-    if data == "noop":
-        return
+async def _on_res(query: CallbackQuery, user_id: int, arg: str) -> None:
+    settings = await get_user_prefs().set(user_id, "resolution", arg)
+    await query.edit_message_reply_markup(
+        reply_markup=settings_keyboard(settings["aspect_ratio"], settings["resolution"])
+    )
 
-    if data.startswith("ratio:"):
-        ratio = data.split(":", 1)[1]
-        _get_settings(user_id)["aspect_ratio"] = ratio
-        settings = _get_settings(user_id)
-        await query.edit_message_reply_markup(
-            reply_markup=settings_keyboard(settings["aspect_ratio"], settings["resolution"])
-        )
 
-    elif data.startswith("res:"):
-        res = data.split(":", 1)[1]
-        _get_settings(user_id)["resolution"] = res
-        settings = _get_settings(user_id)
-        await query.edit_message_reply_markup(
-            reply_markup=settings_keyboard(settings["aspect_ratio"], settings["resolution"])
-        )
+async def _on_done(query: CallbackQuery, user_id: int, arg: str) -> None:
+    settings = get_user_prefs().get(user_id)
+    await query.edit_message_text(
+        f"✅ Inställningar sparade!\n"
+        f"Format: {settings['aspect_ratio']}\n"
+        f"Upplösning: {settings['resolution']}"
+    )
 
-    elif data == "settings:done":
-        settings = _get_settings(user_id)
+
+async def _on_refine(query: CallbackQuery, user_id: int, arg: str) -> None:
+    job_id, _, variant = arg.partition(":")
+    if variant:
         await query.edit_message_text(
-            f"✅ Inställningar sparade!\n"
-            f"Format: {settings['aspect_ratio']}\n"
-            f"Upplösning: {settings['resolution']}"
+            f"✏️ Förfining av {variant} från jobb {job_id}...\n"
+            "Skriv vad du vill ändra som svar på detta meddelande."
         )
 
-    elif data.startswith("refine:"):
-        parts = data.split(":")
-        if len(parts) == 3:
-            job_id, variant = parts[1], parts[2]
-            await query.edit_message_text(
-                f"✏️ Förfining av {variant} från jobb {job_id}...\n"
-                "Skriv vad du vill ändra som svar på detta meddelande."
-            )
 
-    elif data.startswith("cancel:"):
-        job_id = data.split(":", 1)[1]
-        _active_jobs.pop(user_id, None)
-        await query.edit_message_text(f"❌ Jobb `{job_id}` avbrutet.")
+async def _on_cancel(query: CallbackQuery, user_id: int, arg: str) -> None:
+    _active_jobs.pop(user_id, None)
+    await query.edit_message_text(f"❌ Jobb `{arg}` avbrutet.")
+
+
+_CALLBACKS = {
+    CB.RATIO: _on_ratio,
+    CB.RES: _on_res,
+    CB.DONE: _on_done,
+    CB.REFINE: _on_refine,
+    CB.CANCEL: _on_cancel,
+}
+
+
+# Word prefixes used by keyboards sent before the numeric opcodes, so buttons
+# on older messages keep working ("settings:done" parses as op "settings")
+_LEGACY_OPS = {
+    "ratio": CB.RATIO,
+    "res": CB.RES,
+    "settings": CB.DONE,
+    "refine": CB.REFINE,
+    "cancel": CB.CANCEL,
+    "noop": CB.NOOP,
+    "new": CB.NEW,
+}
+
+
+def _parse_callback(data: str) -> tuple[CB | None, str]:
+    op, _, arg = data.partition(":")
+    if op.isdigit():
+        try:
+            return CB(int(op)), arg
+        except ValueError:
+            return None, arg
+    return _LEGACY_OPS.get(op), arg
+
+
+async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle inline keyboard button presses."""
+    query = update.callback_query
+    op, arg = _parse_callback(query.data or "")
+    if op is None:
+        # A button layout this version no longer knows: say so instead of ignoring it
+        await query.answer("Knappen är inaktuell — försök igen.", show_alert=True)
+        return
+    await query.answer()
+
+    handler = _CALLBACKS.get(op)
+    if handler is not None:
+        await handler(query, update.effective_user.id, arg)
 
 
 # ── Pipeline execution + response ──────────────────────────────────
@@ -287,6 +337,7 @@ async def _run_and_respond(
 
         # Remove progress tracker
         await event_bus.unsubscribe(tracker.handle_event)
+        tracker.cancel()
 
         # Update progress message to final state
         if result.error:
@@ -299,7 +350,7 @@ async def _run_and_respond(
             return
 
         # Send results as media group
-        successful_images = [img for img in result.images if img.success and img.file_path]
+        successful_images = result.successful_images
 
         if successful_images:
             # Edit progress to "complete"
@@ -311,12 +362,14 @@ async def _run_and_respond(
             )
 
             # Send images as media group (max 10 per group)
+            payloads = await asyncio.gather(*[
+                asyncio.to_thread(_read_bytes, Path(img.file_path)) for img in successful_images
+            ])
             media = []
-            for img in successful_images:
-                path = Path(img.file_path)
-                if path.exists():
+            for img, payload in zip(successful_images, payloads):
+                if payload is not None:
                     media.append(InputMediaPhoto(
-                        media=open(str(path), "rb"),
+                        media=payload,
                         caption=f"{img.variant_type.value}" if len(media) == 0 else None,
                     ))
 
@@ -355,6 +408,7 @@ async def _run_and_respond(
     except Exception as e:
         logger.exception("Pipeline error for user %d", user_id)
         await event_bus.unsubscribe(tracker.handle_event)
+        tracker.cancel()
         try:
             await context.bot.edit_message_text(
                 chat_id=update.effective_chat.id,
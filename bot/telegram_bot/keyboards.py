@@ -2,40 +2,64 @@
 
 from __future__ import annotations
 
+from enum import IntEnum
+
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 
+class CB(IntEnum):
+    """Callback opcodes; callback_data is ``"{op}:{arg}"``."""
+
+    RATIO = 1
+    RES = 2
+    DONE = 3
+    REFINE = 4
+    CANCEL = 5
+    NOOP = 6
+    NEW = 7
+
+
+def _cb(op: CB, arg: str = "") -> str:
+    return f"{op.value}:{arg}"
+
+
+RATIOS = ("1:1", "4:3", "3:2", "16:9", "9:16", "4:5")
+RESOLUTIONS = ("1K", "2K", "4K")
+
+
+def _option_buttons(op: CB, options: tuple[str, ...]) -> dict[str, tuple[InlineKeyboardButton, InlineKeyboardButton]]:
+    """(plain, checked) button pair per option, built once at import."""
+    return {
+        o: (
+            InlineKeyboardButton(o, callback_data=_cb(op, o)),
+            InlineKeyboardButton(f"✓ {o}", callback_data=_cb(op, o)),
+        )
+        for o in options
+    }
+
+
+_RATIO_BUTTONS = _option_buttons(CB.RATIO, RATIOS)
+_RES_BUTTONS = _option_buttons(CB.RES, RESOLUTIONS)
+_RATIO_HEADER = [InlineKeyboardButton("── Aspect Ratio ──", callback_data=_cb(CB.NOOP))]
+_RES_HEADER = [InlineKeyboardButton("── Resolution ──", callback_data=_cb(CB.NOOP))]
+_DONE_ROW = [InlineKeyboardButton("Done ✓", callback_data=_cb(CB.DONE))]
+
+
 def settings_keyboard(
     current_ratio: str = "4:3",
     current_res: str = "2K",
 ) -> InlineKeyboardMarkup:
     """Settings menu with aspect ratio and resolution options."""
-    ratios = ["1:1", "4:3", "3:2", "16:9", "9:16", "4:5"]
-    resolutions = ["1K", "2K", "4K"]
-
-    ratio_buttons = [
-        InlineKeyboardButton(
-            f"{'✓ ' if r == current_ratio else ''}{r}",
-            callback_data=f"ratio:{r}",
-        )
-        for r in ratios
-    ]
-
-    res_buttons = [
-        InlineKeyboardButton(
-            f"{'✓ ' if r == current_res else ''}{r}",
-            callback_data=f"res:{r}",
-        )
-        for r in resolutions
-    ]
+    ratio_buttons = [pair[o == current_ratio] for o, pair in _RATIO_BUTTONS.items()]
+    res_buttons = [pair[o == current_res] for o, pair in _RES_BUTTONS.items()]
 
     return InlineKeyboardMarkup([
-        [InlineKeyboardButton("── Aspect Ratio ──", callback_data="noop")],
+        _RATIO_HEADER,
         ratio_buttons[:3],
         ratio_buttons[3:],
-        [InlineKeyboardButton("── Resolution ──", callback_data="noop")],
+        _RES_HEADER,
         res_buttons,
-        [InlineKeyboardButton("Done ✓", callback_data="settings:done")],
+        _DONE_ROW,
     ])
 
 
@@ -43,14 +67,14 @@ def refinement_keyboard(job_id: str) -> InlineKeyboardMarkup:
     """Buttons to refine individual variants after generation."""
     buttons = [
         [
-            InlineKeyboardButton(f"Refine v{i}", callback_data=f"refine:{job_id}:v{i}")
+            InlineKeyboardButton(f"Refine v{i}", callback_data=_cb(CB.REFINE, f"{job_id}:v{i}"))
             for i in range(1, 4)
         ],
         [
-            InlineKeyboardButton(f"Refine v{i}", callback_data=f"refine:{job_id}:v{i}")
+            InlineKeyboardButton(f"Refine v{i}", callback_data=_cb(CB.REFINE, f"{job_id}:v{i}"))
             for i in range(4, 6)
         ],
-        [InlineKeyboardButton("New Generation", callback_data=f"new:{job_id}")],
+        [InlineKeyboardButton("New Generation", callback_data=_cb(CB.NEW, job_id))],
     ]
     return InlineKeyboardMarkup(buttons)
 
@@ -58,5 +82,5 @@ def refinement_keyboard(job_id: str) -> InlineKeyboardMarkup:
 def cancel_keyboard(job_id: str) -> InlineKeyboardMarkup:
     """Cancel button shown during generation."""
     return InlineKeyboardMarkup([
-        [InlineKeyboardButton("Cancel", callback_data=f"cancel:{job_id}")],
+        [InlineKeyboardButton("Cancel", callback_data=_cb(CB.CANCEL, job_id))],
     ])
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import deque
 from dataclasses import dataclass, field
 
 from telegram import Bot
@@ -39,6 +41,14 @@ ORDERED_STAGES = [
     PipelineStage.GENERATING,
     PipelineStage.EVALUATING,
 ]
+ORDERED_STAGE_INDEX: dict[PipelineStage, int] = {s: i for i, s in enumerate(ORDERED_STAGES)}
+
+# "emoji label" per ordered stage; only the marker varies between edits
+_STAGE_LINES = [(s, f"{STAGE_EMOJI[s]} {STAGE_LABEL[s]}") for s in ORDERED_STAGES]
+_HEADER = "🐾 *Banana Squad arbetar...*\n"
+
+# Telegram rate-limits edits to roughly one per second per chat
+EDIT_DEBOUNCE = 0.8
 
 
 @dataclass
@@ -51,29 +61,28 @@ class ProgressTracker:
     job_id: str
     current_stage: PipelineStage = PipelineStage.QUEUED
     gen_progress: str = ""
-    agent_messages: list[str] = field(default_factory=list)
-    _last_text: str = ""
+    agent_messages: deque[str] = field(default_factory=lambda: deque(maxlen=5))
+    # hash() of the last sent text; the text itself need not be kept
+    _last_hash: int | None = None
+    _pending: bool = False
+    _flush_task: asyncio.Task | None = field(default=None, repr=False)
 
     def _build_text(self) -> str:
-        lines = [f"🐾 *Banana Squad arbetar...*\n"]
+        lines = [_HEADER]
+        current_idx = ORDERED_STAGE_INDEX.get(self.current_stage, -1)
 
-        for stage in ORDERED_STAGES:
-            emoji = STAGE_EMOJI[stage]
-            label = STAGE_LABEL[stage]
-
-            if stage == self.current_stage:
+        for idx, (stage, label) in enumerate(_STAGE_LINES):
+            if idx == current_idx:
                 marker = "▶️"
-            elif ORDERED_STAGES.index(stage) < ORDERED_STAGES.index(self.current_stage) if self.current_stage in ORDERED_STAGES else False:
+            elif idx < current_idx:
                 marker = "✅"
             else:
                 marker = "⬜"
 
-            line = f"{marker} {emoji} {label}"
-
             if stage == PipelineStage.GENERATING and self.gen_progress:
-                line += f" ({self.gen_progress})"
-
-            lines.append(line)
+                lines.append(f"{marker} {label} ({self.gen_progress})")
+            else:
+                lines.append(f"{marker} {label}")
 
         if self.agent_messages:
             lines.append("")
@@ -102,8 +111,6 @@ class ProgressTracker:
             msg = event.data.get("message", "")
             if msg:
                 self.agent_messages.append(msg)
-                if len(self.agent_messages) > 5:
-                    self.agent_messages = self.agent_messages[-5:]
 
         elif event.type in (EventType.JOB_COMPLETED, EventType.JOB_FAILED):
             if event.type == EventType.JOB_COMPLETED:
@@ -111,11 +118,43 @@ class ProgressTracker:
             else:
                 self.current_stage = PipelineStage.FAILED
 
+            self._cancel_flush()
+            await self._flush()
+            return
+
+        self._pending = True
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after(EDIT_DEBOUNCE))
+
+    def cancel(self) -> None:
+        """Drop any scheduled edit (the caller is taking over the message)."""
+        self._cancel_flush()
+        self._pending = False
+
+    def _cancel_flush(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    async def _flush_after(self, delay: float) -> None:
+        """Coalesce events within ``delay`` into a single edit."""
+        await asyncio.sleep(delay)
+        await self._flush()
+        self._flush_task = None
+        # Events that arrived while the edit was in flight get their own window
+        if self._pending:
+            self._flush_task = asyncio.create_task(self._flush_after(delay))
+
+    async def _flush(self) -> None:
+        self._pending = False
         new_text = self._build_text()
-        if new_text == self._last_text:
+        # Compare the rendered text itself: a repeated agent message still
+        # changes it when older lines scroll out of the deque
+        text_hash = hash(new_text)
+        if text_hash == self._last_hash:
             return
 
-        self._last_text = new_text
+        self._last_hash = text_hash
         try:
             await self.bot.edit_message_text(
                 chat_id=self.chat_id,
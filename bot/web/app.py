@@ -6,7 +6,7 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
-from bot.config import OUTPUTS_DIR
+from bot.config import get_settings
 from bot.web.routes import router
 from bot.web.websocket import ws_manager
 
@@ -30,7 +30,7 @@ def create_app() -> FastAPI:
             ws_manager.disconnect(ws)
 
     # Mount outputs directory for image serving
-    app.mount("/outputs", StaticFiles(directory=str(OUTPUTS_DIR)), name="outputs")
+    app.mount("/outputs", StaticFiles(directory=str(get_settings().outputs_dir)), name="outputs")
 
     # Mount static files (dashboard)
     app.mount("/", StaticFiles(directory=str(STATIC_DIR), html=True), name="static")
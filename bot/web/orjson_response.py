@@ -0,0 +1,30 @@
+"""JSON response class backed by orjson."""
+
+from __future__ import annotations
+
+from enum import Enum
+from pathlib import PurePath
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson doesn't encode natively (datetime, dataclass and Enum it does)."""
+    if isinstance(obj, Enum):  # only reached for values orjson cannot encode
+        return obj.value
+    if isinstance(obj, PurePath):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -4,78 +4,212 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import shutil
-from typing import Optional
-
-from fastapi import APIRouter, File, Form, UploadFile
-from fastapi.responses import JSONResponse
-
-from bot.config import DEFAULT_PRODUCT_IMAGE, REFERENCE_DIR
+import hashlib
+import os
+import re
+import secrets
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from fastapi import APIRouter, File, Form, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+
+from bot.config import REFERENCE_DIR, get_settings
 from bot.pipeline.events import Event, EventType, event_bus
 from bot.pipeline.models import PipelineRequest
 from bot.pipeline.orchestrator import run_pipeline
-from bot.storage.jobs import job_store
+from bot.pipeline.utils import output_relative
+from bot.storage.database import JobSummary
+from bot.storage.jobs import get_job_store
 from bot.pipeline.agents.generator import run_refine
+from bot.web.orjson_response import ORJSONResponse, dumps
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api")
+router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+
+
+# Stateless, so one instance (with its headers already rendered) serves every probe
+_HEALTH_RESPONSE = Response(
+    dumps({"status": "ok", "service": "banana-squad"}), media_type="application/json",
+)
 
 
 @router.get("/health")
-async def health() -> dict:
-    return {"status": "ok", "service": "banana-squad"}
+async def health() -> Response:
+    return _HEALTH_RESPONSE
 
 
 @router.get("/jobs")
 async def list_jobs(
+    request: Request,
     search: Optional[str] = None,
     sort: str = "newest",
-) -> JSONResponse:
+    # Unpaged unless asked: the dashboard loads the whole list in one call
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    include_feedback: bool = False,
+) -> Response:
+    # Writes queued before this request must be in the version the ETag names
+    await get_job_store().flush_async()
+    version = get_job_store().data_version
+    etag = _etag(version)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=_revalidate(etag))
+
+    # Keyed on the store's commit counter, so any write retires every entry
+    key = (search, sort, limit, offset, include_feedback, version)
+    cached = _list_cache.get(key)
+    if cached is not None:
+        return Response(cached, media_type="application/json", headers=_revalidate(etag))
+
+    # Summary columns are precomputed at write time, so no result blobs are
+    # parsed; ordering and paging happen in SQL and rows stream as they're read
+    page = {"limit": limit, "offset": offset, "oldest_first": sort == "oldest"}
     if search:
-        jobs = job_store.search(search)
+        jobs = get_job_store().search_summaries(search, **page)
     else:
-        jobs = job_store.list_all()
+        jobs = get_job_store().iter_summaries(**page)
+
+    if include_feedback:
+        # One query for the whole page instead of one per job
+        jobs = list(jobs)
+        feedback = get_job_store().get_feedback_bulk(j.job_id for j in jobs)
+        rows = (
+            {**_job_row(j), "feedback": _feedback_map(feedback.get(j.job_id, ()))}
+            for j in jobs
+        )
+    else:
+        rows = (_job_row(j) for j in jobs)
+
+    return StreamingResponse(
+        _list_cache.tee(key, _stream_array(rows)),
+        media_type="application/json",
+        headers=_revalidate(etag),
+    )
+
+
+def _job_row(j: JobSummary) -> dict:
+    return {
+        "job_id": j.job_id,
+        "prompt": j.prompt[:120],
+        "stage": j.stage.value,
+        "created_at": j.created_at,
+        "completed_at": j.completed_at,
+        "image_count": j.image_count,
+        "winner": j.winner,
+        "winner_path": j.winner_path,
+    }
+
+
+# ── Conditional GETs ──────────────────────────────────────────────
+# Any committed write changes data_version, so an ETag built from it is valid
+# for every URL until the next write. The boot id keeps ETags from a previous
+# process (whose counter also started at 0) from matching.
+_BOOT_ID = secrets.token_hex(4)
+
+
+def _etag(version: int) -> str:
+    return f'"{_BOOT_ID}-{version}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _revalidate(etag: str) -> dict[str, str]:
+    """Headers making clients revalidate on every poll (cheap, via 304)."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+class _BytesLRU:
+    """Small thread-safe LRU of encoded response bodies."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._data: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._data.get(key)
+            if body is not None:
+                self._data.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        with self._lock:
+            self._data[key] = body
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def tee(self, key: tuple, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass ``chunks`` through, caching the whole body once fully sent."""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self.put(key, b"".join(parts))
+
 
-    if sort == "oldest":
-        jobs = list(reversed(jobs))
+_list_cache = _BytesLRU(maxsize=64)
 
-    return JSONResponse([
+
+def _feedback_map(rows: Iterable[dict]) -> dict:
+    """variant → {rating, selected}"""
+    return {fb["variant"]: {"rating": fb["rating"], "selected": fb["selected"]} for fb in rows}
+
+
+def _stream_array(rows: Iterable[dict]) -> Iterator[bytes]:
+    """Encode a JSON array one element at a time.
+
+    A plain generator, so Starlette advances it in its threadpool and the
+    SQLite reads behind ``rows`` stay off the event loop.
+    """
+    yield b"["
+    sep = b""
+    for row in rows:
+        yield sep + dumps(row)
+        sep = b","
+    yield b"]"
+
+
+@router.get("/jobs/active")
+async def list_active_jobs() -> ORJSONResponse:
+    """In-progress jobs from the status columns alone (no result parsing)."""
+    return ORJSONResponse([
         {
-            "job_id": j.job_id,
-            "prompt": j.request.user_prompt[:120],
-            "stage": j.stage.value,
-            "created_at": j.request.created_at.isoformat(),
-            "completed_at": j.completed_at.isoformat() if j.completed_at else None,
-            "image_count": sum(1 for img in j.images if img.success),
-            "winner": j.evaluation.winner.value if j.evaluation and j.evaluation.winner else None,
-            "winner_path": _winner_path(j),
+            "job_id": row.job_id,
+            "prompt": row.prompt[:120],
+            "stage": row.stage.value,
+            "created_at": row.created_at,
         }
-        for j in jobs
+        for row in get_job_store().list_active_summary()
     ])
 
 
-def _winner_path(j) -> Optional[str]:
-    """Return the output-relative path of the winning image, if any."""
-    if not j.evaluation or not j.evaluation.winner:
-        return None
-    for img in j.images:
-        if img.variant_type == j.evaluation.winner and img.success and img.file_path:
-            path = img.file_path
-            return path.split("/outputs/")[-1] if "/outputs/" in path else path
-    return None
-
-
 @router.get("/jobs/{job_id}")
-async def get_job(job_id: str) -> JSONResponse:
-    job = job_store.get(job_id)
+async def get_job(job_id: str, request: Request) -> Response:
+    await get_job_store().flush_async()
+    etag = _etag(get_job_store().data_version)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=_revalidate(etag))
+
+    job = get_job_store().get(job_id)
     if not job:
-        return JSONResponse({"error": "Job not found"}, status_code=404)
+        return ORJSONResponse({"error": "Job not found"}, status_code=404)
 
     images = [
         {
             "variant": img.variant_type.value,
-            "file_path": img.file_path.split("/outputs/")[-1] if img.file_path and "/outputs/" in img.file_path else img.file_path,
+            "file_path": output_relative(img.file_path) if img.file_path else img.file_path,
             "success": img.success,
             "error": img.error,
         }
@@ -100,19 +234,17 @@ async def get_job(job_id: str) -> JSONResponse:
             for ev in job.evaluation.evaluations
         ]
 
-    # Build feedback map: variant → {rating, selected}
-    feedback_rows = job_store.get_feedback(job_id)
-    feedback = {
-        fb["variant"]: {"rating": fb["rating"], "selected": fb["selected"]}
-        for fb in feedback_rows
-    }
+    feedback = _feedback_map(get_job_store().get_feedback(job_id))
+
+    # datetimes and str-enums are left to orjson, which encodes them natively
+    # (identical to isoformat() for these tz-aware values)
 
-    return JSONResponse({
+    return ORJSONResponse({
         "job_id": job.job_id,
         "prompt": job.request.user_prompt,
         "stage": job.stage.value,
-        "created_at": job.request.created_at.isoformat(),
-        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "created_at": job.request.created_at,
+        "completed_at": job.completed_at,
         "aspect_ratio": job.request.aspect_ratio,
         "resolution": job.request.resolution,
         "research": {
@@ -135,9 +267,9 @@ async def get_job(job_id: str) -> JSONResponse:
             {
                 "variant": r.variant,
                 "instruction": r.instruction,
-                "original_path": r.original_path.split("/outputs/")[-1] if "/outputs/" in r.original_path else r.original_path,
-                "refined_path": r.refined_path.split("/outputs/")[-1] if "/outputs/" in r.refined_path else r.refined_path,
-                "created_at": r.created_at.isoformat(),
+                "original_path": output_relative(r.original_path),
+                "refined_path": output_relative(r.refined_path),
+                "created_at": r.created_at,
             }
             for r in job.refinements
         ],
@@ -145,7 +277,7 @@ async def get_job(job_id: str) -> JSONResponse:
         "winner": job.evaluation.winner.value if job.evaluation and job.evaluation.winner else None,
         "error": job.error,
         "feedback": feedback,
-    })
+    }, headers=_revalidate(etag))
 
 
 @router.post("/jobs/{job_id}/feedback")
@@ -154,22 +286,60 @@ async def submit_feedback(
     variant: str = Form(...),
     rating: int = Form(0),
     selected: bool = Form(False),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Save feedback (thumbs up/down, selection) for a variant."""
-    job = job_store.get(job_id)
+    job = get_job_store().get(job_id)
     if not job:
-        return JSONResponse({"error": "Job not found"}, status_code=404)
+        return ORJSONResponse({"error": "Job not found"}, status_code=404)
 
     if rating not in (-1, 0, 1):
-        return JSONResponse({"error": "Rating must be -1, 0, or 1"}, status_code=400)
+        return ORJSONResponse({"error": "Rating must be -1, 0, or 1"}, status_code=400)
 
     # Validate variant exists in this job
     valid_variants = {img.variant_type.value for img in job.images}
     if variant not in valid_variants:
-        return JSONResponse({"error": "Invalid variant for this job"}, status_code=400)
+        return ORJSONResponse({"error": "Invalid variant for this job"}, status_code=400)
+
+    # Reply only once the write is committed so a follow-up read sees it
+    await asyncio.wrap_future(get_job_store().save_feedback(job_id, variant, rating, selected))
+    return ORJSONResponse({"status": "ok"})
 
-    job_store.save_feedback(job_id, variant, rating, selected)
-    return JSONResponse({"status": "ok"})
+
+_COPY_BUFSIZE = 1 << 20
+
+
+_SAFE_SUFFIX = re.compile(r"\.[a-z0-9]{1,8}")
+
+
+def _save_upload(upload: UploadFile, ref_dir: Path) -> str:
+    """Store an upload as ``web-<content hash><ext>``; returns its path. Blocking — run in a thread.
+
+    The client's filename is only consulted for its extension. Hashing while
+    copying means a repeat upload of the same image resolves to the existing
+    file, which keeps its mtime — so the memoized reference encodes still hit.
+    """
+    suffix = Path(upload.filename or "").suffix.lower()
+    if not _SAFE_SUFFIX.fullmatch(suffix):
+        suffix = ""
+
+    h = hashlib.blake2b(digest_size=8)
+    with tempfile.NamedTemporaryFile(dir=ref_dir, prefix=".upload-", delete=False) as tmp:
+        try:
+            # read() rather than readinto(): SpooledTemporaryFile only has the
+            # latter from Python 3.11
+            while chunk := upload.file.read(_COPY_BUFSIZE):
+                h.update(chunk)
+                tmp.write(chunk)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+    dest = ref_dir / f"web-{h.hexdigest()}{suffix}"
+    if dest.exists():
+        os.unlink(tmp.name)
+    else:
+        os.replace(tmp.name, dest)
+    return str(dest)
 
 
 @router.post("/generate")
@@ -179,25 +349,26 @@ async def generate(
     resolution: str = Form("2K"),
     password: str = Form(""),
     files: list[UploadFile] = File(default=[]),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Accept a generation request from the web form."""
 
     if password != "apoteket":
-        return JSONResponse({"error": "Fel lösenord"}, status_code=403)
+        return ORJSONResponse({"error": "Fel lösenord"}, status_code=403)
 
     ref_paths: list[str] = []
 
     # Always include the default product image first
-    if DEFAULT_PRODUCT_IMAGE and DEFAULT_PRODUCT_IMAGE.exists():
-        ref_paths.append(str(DEFAULT_PRODUCT_IMAGE))
-
-    for upload in files:
-        if not upload.filename:
-            continue
-        dest = REFERENCE_DIR / f"web-{upload.filename}"
-        with open(dest, "wb") as f:
-            shutil.copyfileobj(upload.file, f)
-        ref_paths.append(str(dest))
+    # Loading settings also makes sure REFERENCE_DIR exists for the uploads
+    product_image = get_settings().default_product_image
+    if product_image and product_image.exists():
+        ref_paths.append(str(product_image))
+
+    # Uploads are written in parallel; gather keeps them in submission order
+    ref_paths.extend(await asyncio.gather(*(
+        asyncio.to_thread(_save_upload, upload, REFERENCE_DIR)
+        for upload in files
+        if upload.filename
+    )))
 
     request = PipelineRequest(
         user_prompt=prompt,
@@ -209,7 +380,7 @@ async def generate(
     # Fire pipeline in background — client tracks via WebSocket
     asyncio.create_task(run_pipeline(request))
 
-    return JSONResponse({"job_id": request.job_id}, status_code=202)
+    return ORJSONResponse({"job_id": request.job_id}, status_code=202)
 
 
 @router.post("/refine")
@@ -217,34 +388,24 @@ async def refine(
     job_id: str = Form(...),
     variant: str = Form(...),
     instruction: str = Form(""),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Refine a single variant image. Old image is preserved."""
 
-    job = job_store.get(job_id)
+    job = get_job_store().get(job_id)
     if not job:
-        return JSONResponse({"error": "Job not found"}, status_code=404)
-
-    # Find the original image for this variant
-    original_img = None
-    for img in job.images:
-        if img.variant_type.value == variant and img.success and img.file_path:
-            original_img = img
-            break
+        return ORJSONResponse({"error": "Job not found"}, status_code=404)
 
-    if not original_img:
-        return JSONResponse({"error": "Variant image not found"}, status_code=404)
+    original_img = job.images_by_variant.get(variant)
+    if not original_img or not original_img.success or not original_img.file_path:
+        return ORJSONResponse({"error": "Variant image not found"}, status_code=404)
 
-    # Find the original prompt for this variant
-    original_prompt = job.request.user_prompt
-    for p in job.prompts:
-        if p.variant_type.value == variant:
-            original_prompt = p.narrative_prompt
-            break
+    variant_prompt = job.prompts_by_variant.get(variant)
+    original_prompt = variant_prompt.narrative_prompt if variant_prompt else job.request.user_prompt
 
     # Run refinement in background
     async def _do_refine():
         try:
-            await event_bus.emit(Event(
+            await event_bus.emit_async(Event(
                 type=EventType.PROGRESS,
                 job_id=job_id,
                 data={"agent": "generator", "message": f"Refining {variant}..."},
@@ -262,29 +423,27 @@ async def refine(
             )
 
             # Persist refinement to job
-            job_fresh = job_store.get(job_id)
+            job_fresh = get_job_store().get(job_id)
             if job_fresh:
-                job_fresh.refinements.append(refinement)
-                job_store.update_result(job_fresh)
-
-            refined_rel = refinement.refined_path
-            if "/outputs/" in refined_rel:
-                refined_rel = refined_rel.split("/outputs/")[-1]
+                refined = job_fresh.model_copy(
+                    update={"refinements": [*job_fresh.refinements, refinement]},
+                )
+                await asyncio.wrap_future(get_job_store().update_result(refined))
 
-            await event_bus.emit(Event(
+            await event_bus.emit_async(Event(
                 type=EventType.IMAGE_REFINED,
                 job_id=job_id,
                 data={
                     "variant": variant,
                     "instruction": instruction,
-                    "refined_path": refined_rel,
-                    "original_path": original_img.file_path.split("/outputs/")[-1] if "/outputs/" in original_img.file_path else original_img.file_path,
+                    "refined_path": output_relative(refinement.refined_path),
+                    "original_path": output_relative(original_img.file_path),
                 },
             ))
 
         except Exception as e:
             logger.exception("Refinement failed for %s/%s", job_id, variant)
-            await event_bus.emit(Event(
+            await event_bus.emit_async(Event(
                 type=EventType.JOB_FAILED,
                 job_id=job_id,
                 data={"error": f"Refinement failed: {e}"},
@@ -292,4 +451,4 @@ async def refine(
 
     asyncio.create_task(_do_refine())
 
-    return JSONResponse({"status": "refining", "job_id": job_id, "variant": variant}, status_code=202)
+    return ORJSONResponse({"status": "refining", "job_id": job_id, "variant": variant}, status_code=202)
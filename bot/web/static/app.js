@@ -41,9 +41,13 @@
 
   // ── WebSocket ──────────────────────────────────────────
 
+  const utf8 = new TextDecoder();
+
   function connect() {
     const proto = location.protocol === "https:" ? "wss:" : "ws:";
     ws = new WebSocket(`${proto}//${location.host}/ws`);
+    // Events arrive as binary frames of UTF-8 JSON
+    ws.binaryType = "arraybuffer";
 
     ws.onopen = () => {
       $statusDot.className = "status-dot connected";
@@ -60,7 +64,8 @@
 
     ws.onmessage = (e) => {
       try {
-        handleEvent(JSON.parse(e.data));
+        const text = typeof e.data === "string" ? e.data : utf8.decode(e.data);
+        handleEvent(JSON.parse(text));
       } catch (err) {
         console.error("WS parse error:", err);
       }
@@ -170,6 +175,7 @@
         break;
 
       case "variant_scored":
+      case "variants_scored_batch":
         delete jobDetailCache[job_id];
         break;
 
@@ -2,43 +2,57 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from fastapi import WebSocket
 
-from bot.pipeline.events import Event, event_bus
+from bot.pipeline.events import SUBSCRIBER_TIMEOUT, Event, event_bus
 
 logger = logging.getLogger(__name__)
 
+# Seconds one socket may take to accept a frame before it is dropped; kept
+# under the bus's subscriber timeout so a slow peer never cancels the others
+SEND_TIMEOUT = SUBSCRIBER_TIMEOUT / 2
+
 
 class ConnectionManager:
     """Manages WebSocket connections and broadcasts events."""
 
     def __init__(self) -> None:
-        self._connections: list[WebSocket] = []
+        self._connections: set[WebSocket] = set()
 
     async def connect(self, ws: WebSocket) -> None:
         await ws.accept()
-        self._connections.append(ws)
+        self._connections.add(ws)
         logger.info("WebSocket connected (%d total)", len(self._connections))
 
     def disconnect(self, ws: WebSocket) -> None:
-        self._connections = [c for c in self._connections if c is not ws]
+        self._connections.discard(ws)
         logger.info("WebSocket disconnected (%d remaining)", len(self._connections))
 
-    async def broadcast(self, message: str) -> None:
-        dead: list[WebSocket] = []
-        for ws in self._connections:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.disconnect(ws)
+    async def broadcast(self, data: bytes) -> None:
+        # Snapshot: connect/disconnect may run while the sends are awaiting.
+        # Sent concurrently, so one backpressured client doesn't delay the rest
+        conns = list(self._connections)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ws.send_bytes(data), SEND_TIMEOUT) for ws in conns),
+            return_exceptions=True,
+        )
+        dead = 0
+        for ws, r in zip(conns, results):
+            # asyncio.TimeoutError is an Exception too: a stalled peer goes the same way
+            if isinstance(r, Exception):
+                self._connections.discard(ws)
+                dead += 1
+        if dead:
+            logger.info("Dropped %d dead WebSocket(s) (%d remaining)", dead, len(self._connections))
 
     async def handle_event(self, event: Event) -> None:
         """EventBus subscriber — forwards all events to WebSocket clients."""
-        await self.broadcast(event.to_json())
+        # Encoded once per event and shared by every peer; sent as binary
+        # frames so there is no per-socket str → UTF-8 conversion
+        await self.broadcast(event.payload_bytes)
 
 
 # Singleton